@@ -4,6 +4,7 @@ Smurfing Hunter - Complete Demo Script
 Runs the entire money laundering detection system and displays results
 """
 
+import logging
 import os
 import sys
 from datetime import datetime
@@ -25,6 +26,7 @@ def print_section(text):
     print("─" * 80)
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print_banner("SMURFING HUNTER - COMPLETE DEMONSTRATION", "═")
     print("Money Laundering Detection in Blockchain Transactions")
     print("Domain: RegTech / Crypto-Forensics / Graph Theory")
@@ -3,11 +3,32 @@ Graph Builder Module
 Handles loading transaction data and building the blockchain transaction graph
 """
 
+import logging
 import pandas as pd
 import networkx as nx
 from datetime import datetime
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterator, List, Optional, Tuple, Set
+from collections import deque
 import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    import pyarrow as pa  # multi-threaded Arrow CSV reader
+    from pyarrow import csv as pa_csv
+    CSV_ENGINE = 'pyarrow'
+except ImportError:  # PyArrow is optional; fall back to pandas' C parser
+    CSV_ENGINE = 'c'
+
+logger = logging.getLogger(__name__)
+
+# Column types for the transaction CSV. Wallet IDs must stay strings: left to
+# type inference, short hex IDs such as 0xabc would be read as integers
+TRANSACTION_DTYPES = {
+    'Source_Wallet_ID': str,
+    'Dest_Wallet_ID': str,
+    'Amount': 'float64',
+    'Token_Type': str,
+}
 
 
 class BlockchainGraph:
@@ -20,6 +41,7 @@ class BlockchainGraph:
         self.transactions = []
         self.illicit_wallets = set()
         self.wallet_metadata = {}
+        self._build_csr()
         
     def load_transactions(self, csv_path: str) -> None:
         """
@@ -27,7 +49,7 @@ class BlockchainGraph:
         
         Expected columns: Source_Wallet_ID, Dest_Wallet_ID, Timestamp, Amount, Token_Type
         """
-        df = pd.read_csv(csv_path)
+        df = _read_csv(csv_path, TRANSACTION_DTYPES)
         
         # Validate required columns
         required_cols = ['Source_Wallet_ID', 'Dest_Wallet_ID', 'Timestamp', 'Amount', 'Token_Type']
@@ -40,48 +62,158 @@ class BlockchainGraph:
         self.transactions = df.to_dict('records')
         self._build_graph(df)
         
-        print(f"Loaded {len(self.transactions)} transactions")
-        print(f"Graph has {self.graph.number_of_nodes()} wallets and {self.graph.number_of_edges()} edges")
+        logger.info("Loaded %d transactions", len(self.transactions))
+        logger.info("Graph has %d wallets and %d edges",
+                    self.graph.number_of_nodes(), self.graph.number_of_edges())
         
     def _build_graph(self, df: pd.DataFrame) -> None:
         """
         Build directed graph from transaction dataframe
+        
+        Transactions are aggregated per wallet and per (source, dest) pair with
+        vectorized pandas/NumPy operations and the results are added in bulk.
+        Wallets and edges already in the graph are updated in place.
         """
-        for _, row in df.iterrows():
-            source = row['Source_Wallet_ID']
-            dest = row['Dest_Wallet_ID']
-            amount = row['Amount']
-            timestamp = row['Timestamp']
-            token_type = row['Token_Type']
-            
-            # Add nodes
-            if not self.graph.has_node(source):
-                self.graph.add_node(source, wallet_id=source, total_sent=0, total_received=0, 
-                                   first_seen=timestamp, last_seen=timestamp, 
-                                   transaction_count=0)
-            if not self.graph.has_node(dest):
-                self.graph.add_node(dest, wallet_id=dest, total_sent=0, total_received=0,
-                                   first_seen=timestamp, last_seen=timestamp,
-                                   transaction_count=0)
-            
-            # Update node metadata
-            self.graph.nodes[source]['total_sent'] += amount
-            self.graph.nodes[dest]['total_received'] += amount
-            self.graph.nodes[source]['last_seen'] = max(self.graph.nodes[source]['last_seen'], timestamp)
-            self.graph.nodes[dest]['last_seen'] = max(self.graph.nodes[dest]['last_seen'], timestamp)
-            self.graph.nodes[source]['transaction_count'] += 1
-            self.graph.nodes[dest]['transaction_count'] += 1
+        n_transactions = len(df)
+        amounts = df['Amount'].to_numpy(dtype=np.float64)
+        timestamps = df['Timestamp'].tolist()
+        token_types = df['Token_Type'].tolist()
+        
+        # Number wallets in order of first appearance, source before dest in each row
+        appearances = np.empty(2 * n_transactions, dtype=object)
+        appearances[0::2] = df['Source_Wallet_ID'].to_numpy()
+        appearances[1::2] = df['Dest_Wallet_ID'].to_numpy()
+        codes, wallets = pd.factorize(appearances)
+        source_codes, dest_codes = codes[0::2], codes[1::2]
+        n_wallets = len(wallets)
+        
+        # Per-wallet metadata (bincount accumulates in row order, like a running sum)
+        total_sent = np.bincount(source_codes, weights=amounts, minlength=n_wallets)
+        total_received = np.bincount(dest_codes, weights=amounts, minlength=n_wallets)
+        transaction_count = np.bincount(codes, minlength=n_wallets)
+        seen = pd.Series(np.repeat(df['Timestamp'].to_numpy(), 2)).groupby(codes)
+        first_seen = seen.first().tolist()
+        last_seen = seen.max().tolist()
+        
+        new_nodes = []
+        for i, wallet in enumerate(wallets):
+            if self.graph.has_node(wallet):
+                node = self.graph.nodes[wallet]
+                node['total_sent'] += total_sent[i]
+                node['total_received'] += total_received[i]
+                node['last_seen'] = max(node['last_seen'], last_seen[i])
+                node['transaction_count'] += int(transaction_count[i])
+            else:
+                new_nodes.append((wallet, dict(
+                    wallet_id=wallet, total_sent=float(total_sent[i]),
+                    total_received=float(total_received[i]), first_seen=first_seen[i],
+                    last_seen=last_seen[i], transaction_count=int(transaction_count[i]))))
+        self.graph.add_nodes_from(new_nodes)
+        
+        # Aggregate multiple transactions between same wallets, in order of first transaction
+        pair_codes, pairs = pd.factorize(source_codes.astype(np.int64) * n_wallets + dest_codes)
+        n_pairs = len(pairs)
+        edge_amounts = np.bincount(pair_codes, weights=amounts, minlength=n_pairs)
+        edge_counts = np.bincount(pair_codes, minlength=n_pairs)
+        rows_by_edge = np.split(np.argsort(pair_codes, kind='stable'), np.cumsum(edge_counts)[:-1])
+        
+        new_edges = []
+        for pair, amount, rows in zip(pairs, edge_amounts, rows_by_edge):
+            source, dest = wallets[pair // n_wallets], wallets[pair % n_wallets]
+            edge_times = [timestamps[row] for row in rows]
             
-            # Add or update edge
             if self.graph.has_edge(source, dest):
-                # Aggregate multiple transactions between same wallets
-                self.graph[source][dest]['amount'] += amount
-                self.graph[source][dest]['transaction_count'] += 1
-                self.graph[source][dest]['timestamps'].append(timestamp)
+                edge = self.graph[source][dest]
+                edge['amount'] += amount
+                edge['transaction_count'] += len(rows)
+                edge['timestamps'].extend(edge_times)
             else:
-                self.graph.add_edge(source, dest, amount=amount, token_type=token_type,
-                                   timestamp=timestamp, timestamps=[timestamp],
-                                   transaction_count=1)
+                new_edges.append((source, dest, dict(
+                    amount=float(amount), token_type=token_types[rows[0]],
+                    timestamp=edge_times[0], timestamps=edge_times,
+                    transaction_count=len(rows))))
+        self.graph.add_edges_from(new_edges)
+        
+        self._build_csr()
+    
+    def _build_csr(self) -> None:
+        """
+        Mirror the graph as CSR-style arrays (struct of arrays) for fast traversal
+        
+        Wallet i (in graph node order) has its outgoing edges at positions
+        indptr[i]:indptr[i+1] of the per-edge arrays: successor index, amount,
+        transaction count and first/last timestamp (int64 ns). Edge e's individual
+        transaction times, sorted, are edge_times[edge_time_indptr[e]:edge_time_indptr[e+1]].
+        pred_indptr and pred_indices list each wallet's predecessors the same way,
+        and edge_index maps a (source, dest) pair to its edge position.
+        """
+        self.wallets = list(self.graph.nodes())
+        self.wallet_index = {wallet: i for i, wallet in enumerate(self.wallets)}
+        n_wallets = len(self.wallets)
+        
+        self.indptr = np.zeros(n_wallets + 1, dtype=np.int64)
+        self.edge_index = {}
+        indices, amounts, tx_counts, times, n_times = [], [], [], [], []
+        
+        for i, wallet in enumerate(self.wallets):
+            for succ, data in self.graph.adj[wallet].items():
+                edge_times = data['timestamps'] if 'timestamps' in data else [data['timestamp']]
+                self.edge_index[(wallet, succ)] = len(indices)
+                indices.append(self.wallet_index[succ])
+                amounts.append(data['amount'])
+                tx_counts.append(data.get('transaction_count', 1))
+                times.extend(edge_times)
+                n_times.append(len(edge_times))
+            self.indptr[i + 1] = len(indices)
+        
+        self.indices = np.array(indices, dtype=np.int32)
+        self.edge_amount = np.array(amounts, dtype=np.float64)
+        self.edge_tx_count = np.array(tx_counts, dtype=np.int64)
+        # Used to normalize pattern amounts in suspicion scoring
+        self.median_edge_amount = float(np.median(self.edge_amount)) if indices else 1.0
+        
+        # Flat transaction times, sorted within each edge's segment
+        self.edge_time_indptr = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(n_times, out=self.edge_time_indptr[1:])
+        times = pd.DatetimeIndex(times).as_unit('ns').asi8
+        edge_of_time = np.repeat(np.arange(len(indices)), n_times)
+        self.edge_times = times[np.lexsort((times, edge_of_time))]
+        self.edge_first_time = self.edge_times[self.edge_time_indptr[:-1]]
+        self.edge_last_time = self.edge_times[self.edge_time_indptr[1:] - 1]
+        
+        # Reverse CSR: predecessors grouped by destination
+        self.out_degree = np.diff(self.indptr)
+        self.pred_indptr = np.zeros(n_wallets + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=n_wallets), out=self.pred_indptr[1:])
+        sources = np.repeat(np.arange(n_wallets, dtype=np.int32), self.out_degree)
+        self.pred_indices = sources[np.argsort(self.indices, kind='stable')]
+        self.in_degree = np.diff(self.pred_indptr)
+        
+        # The same arrays as a SciPy sparse matrix (weights are edge amounts) for
+        # csgraph routines and sparse linear algebra
+        self.adjacency = csr_matrix((self.edge_amount, self.indices, self.indptr),
+                                    shape=(n_wallets, n_wallets))
+        
+        nodes = self.graph.nodes
+        self.wallet_total_sent = np.array(
+            [nodes[w].get('total_sent', 0) for w in self.wallets], dtype=np.float64)
+        self.wallet_total_received = np.array(
+            [nodes[w].get('total_received', 0) for w in self.wallets], dtype=np.float64)
+        self.wallet_tx_count = np.array(
+            [nodes[w].get('transaction_count', 0) for w in self.wallets], dtype=np.int64)
+        
+        self._build_illicit_mask()
+    
+    def _build_illicit_mask(self) -> None:
+        """
+        Flag illicit wallets in a bool array aligned with the CSR wallet indices
+        """
+        self.illicit_mask = np.zeros(len(self.wallets), dtype=bool)
+        self.illicit_mask[[self.wallet_index[w] for w in self.illicit_wallets
+                           if w in self.wallet_index]] = True
+        
+        self._illicit_distance = None
+        self._illicit_parent = None
     
     def load_illicit_wallets(self, csv_path: str) -> None:
         """
@@ -89,23 +221,59 @@ class BlockchainGraph:
         
         Expected columns: Wallet_ID, Reason (optional)
         """
-        df = pd.read_csv(csv_path)
+        df = _read_csv(csv_path, {'Wallet_ID': str, 'Reason': str})
         
         if 'Wallet_ID' not in df.columns:
             raise ValueError("CSV must contain 'Wallet_ID' column")
         
         self.illicit_wallets = set(df['Wallet_ID'].values)
+        self._build_illicit_mask()
+        
+        # First listed reason per wallet, looked up in O(1) below
+        reasons = {}
+        if 'Reason' in df.columns:
+            first_rows = df.drop_duplicates('Wallet_ID')
+            reasons = dict(zip(first_rows['Wallet_ID'], first_rows['Reason']))
         
         # Mark illicit wallets in graph
         for wallet in self.illicit_wallets:
             if self.graph.has_node(wallet):
                 self.graph.nodes[wallet]['illicit'] = True
-                if 'Reason' in df.columns:
-                    reason = df[df['Wallet_ID'] == wallet]['Reason'].iloc[0]
-                    self.graph.nodes[wallet]['illicit_reason'] = reason
+                if wallet in reasons:
+                    self.graph.nodes[wallet]['illicit_reason'] = reasons[wallet]
         
-        print(f"Loaded {len(self.illicit_wallets)} illicit wallets")
+        logger.info("Loaded %d illicit wallets", len(self.illicit_wallets))
         
+    def get_illicit_distances(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hop distance from every wallet to its nearest illicit wallet
+        
+        One multi-source BFS from all illicit wallets over the reverse CSR gives,
+        per wallet index, the distance (-1 if no illicit wallet is reachable) and
+        the next wallet index on a shortest path towards it (-1 at the end).
+        Cached until the graph or the illicit wallets are reloaded.
+        """
+        if self._illicit_distance is None:
+            n_wallets = len(self.wallets)
+            distance = np.full(n_wallets, -1, dtype=np.int32)
+            parent = np.full(n_wallets, -1, dtype=np.int32)
+            
+            seeds = np.flatnonzero(self.illicit_mask)
+            distance[seeds] = 0
+            queue = deque(seeds.tolist())
+            
+            while queue:
+                i = queue.popleft()
+                for pred in self.pred_indices[self.pred_indptr[i]:self.pred_indptr[i + 1]].tolist():
+                    if distance[pred] < 0:
+                        distance[pred] = distance[i] + 1
+                        parent[pred] = i
+                        queue.append(pred)
+            
+            self._illicit_distance = distance
+            self._illicit_parent = parent
+        return self._illicit_distance, self._illicit_parent
+    
     def get_neighbors(self, wallet: str, direction: str = 'both') -> Set[str]:
         """
         Get neighbors of a wallet
@@ -114,38 +282,63 @@ class BlockchainGraph:
             wallet: Wallet ID
             direction: 'in' (predecessors), 'out' (successors), or 'both'
         """
+        return set(self.iter_neighbors(wallet, direction))
+    
+    def iter_neighbors(self, wallet: str, direction: str = 'both') -> Iterator[str]:
+        """
+        Iterate over the neighbors of a wallet without building a set
+        
+        Each neighbor is yielded once, also for direction='both'.
+        """
+        wallets = self.wallets
+        for j in self.get_neighbor_ids(self.wallet_index[wallet], direction).tolist():
+            yield wallets[j]
+    
+    def get_neighbor_ids(self, wallet_id: int, direction: str = 'both') -> np.ndarray:
+        """
+        Wallet indices of the neighbors of wallet_id
+        
+        For 'in' and 'out' this is a read-only view into the CSR arrays;
+        'both' merges them into a new sorted array without duplicates.
+        """
+        successors = self.indices[self.indptr[wallet_id]:self.indptr[wallet_id + 1]]
+        predecessors = self.pred_indices[self.pred_indptr[wallet_id]:self.pred_indptr[wallet_id + 1]]
+        
         if direction == 'in':
-            return set(self.graph.predecessors(wallet))
+            ids = predecessors
         elif direction == 'out':
-            return set(self.graph.successors(wallet))
+            ids = successors
         else:
-            return set(self.graph.predecessors(wallet)) | set(self.graph.successors(wallet))
+            return np.union1d(predecessors, successors)
+        ids = ids.view()
+        ids.flags.writeable = False
+        return ids
     
     def get_path_amount_flow(self, path: List[str]) -> float:
         """
         Calculate total amount flowing through a path
         """
         total = 0
-        for i in range(len(path) - 1):
-            if self.graph.has_edge(path[i], path[i+1]):
-                total += self.graph[path[i]][path[i+1]]['amount']
+        for hop in zip(path, path[1:]):
+            edge = self.edge_index.get(hop)
+            if edge is not None:
+                total += self.edge_amount[edge]
         return total
     
     def get_wallet_features(self, wallet: str) -> Dict:
         """
         Extract features for a wallet node
         """
-        if not self.graph.has_node(wallet):
+        i = self.wallet_index.get(wallet)
+        if i is None:
             return {}
         
-        node_data = self.graph.nodes[wallet]
-        
         features = {
-            'in_degree': self.graph.in_degree(wallet),
-            'out_degree': self.graph.out_degree(wallet),
-            'total_received': node_data.get('total_received', 0),
-            'total_sent': node_data.get('total_sent', 0),
-            'transaction_count': node_data.get('transaction_count', 0),
+            'in_degree': int(self.in_degree[i]),
+            'out_degree': int(self.out_degree[i]),
+            'total_received': float(self.wallet_total_received[i]),
+            'total_sent': float(self.wallet_total_sent[i]),
+            'transaction_count': int(self.wallet_tx_count[i]),
             'is_illicit': wallet in self.illicit_wallets,
         }
         
@@ -160,26 +353,65 @@ class BlockchainGraph:
         
         return features
     
+    def get_all_wallet_features_array(self) -> np.ndarray:
+        """
+        Numeric features of every wallet as one (n_wallets, 5) float32 array
+        
+        Rows follow the CSR wallet indices; the columns are in_degree, out_degree,
+        fanout_ratio, fanin_ratio and transaction_count, as in get_wallet_features.
+        """
+        features = np.empty((len(self.wallets), 5), dtype=np.float32)
+        features[:, 0] = self.in_degree
+        features[:, 1] = self.out_degree
+        np.divide(features[:, 1], np.maximum(features[:, 0], 1), out=features[:, 2])
+        np.divide(features[:, 0], np.maximum(features[:, 1], 1), out=features[:, 3])
+        features[:, 4] = self.wallet_tx_count
+        return features
+    
     def get_subgraph_around_wallet(self, wallet: str, hops: int = 2) -> nx.DiGraph:
         """
         Extract subgraph around a wallet within specified number of hops
         """
-        if not self.graph.has_node(wallet):
+        if wallet not in self.wallet_index:
             return nx.DiGraph()
         
-        # BFS to get nodes within hops
-        nodes = {wallet}
-        current_level = {wallet}
+        # Edges are selected on the CSR arrays; the DiGraph is only built at the end
+        node_ids = self.get_neighborhood_ids(self.wallet_index[wallet], hops)
+        in_subgraph = np.zeros(len(self.wallets), dtype=bool)
+        in_subgraph[node_ids] = True
+        
+        edge_idx = _gather_out_edges(self.indptr, node_ids)
+        sources = np.repeat(node_ids, self.out_degree[node_ids])
+        keep = in_subgraph[self.indices[edge_idx]]
+        
+        wallets, nodes, adj = self.wallets, self.graph.nodes, self.graph.adj
+        subgraph = nx.DiGraph()
+        subgraph.add_nodes_from((wallets[i], nodes[wallets[i]]) for i in node_ids.tolist())
+        subgraph.add_edges_from(
+            (wallets[u], wallets[v], adj[wallets[u]][wallets[v]])
+            for u, v in zip(sources[keep].tolist(), self.indices[edge_idx[keep]].tolist()))
+        return subgraph
+    
+    def get_neighborhood_ids(self, wallet_id: int, hops: int) -> np.ndarray:
+        """
+        Indices of all wallets within hops of wallet_id, ignoring edge direction
+        
+        Each BFS level is expanded at once through the forward and reverse CSR.
+        """
+        visited = np.zeros(len(self.wallets), dtype=bool)
+        visited[wallet_id] = True
+        frontier = np.array([wallet_id], dtype=np.int64)
         
         for _ in range(hops):
-            next_level = set()
-            for node in current_level:
-                next_level.update(self.graph.successors(node))
-                next_level.update(self.graph.predecessors(node))
-            nodes.update(next_level)
-            current_level = next_level
+            successors = self.indices[_gather_out_edges(self.indptr, frontier)]
+            predecessors = self.pred_indices[_gather_out_edges(self.pred_indptr, frontier)]
+            reached = np.concatenate([successors, predecessors])
+            frontier = np.unique(reached[~visited[reached]]).astype(np.int64)
+            if frontier.size == 0:
+                break
+            visited[frontier] = True
         
-        return self.graph.subgraph(nodes).copy()
+        return np.flatnonzero(visited)
     
 
     
@@ -192,3 +424,33 @@ class BlockchainGraph:
             if self.graph.has_edge(path[i], path[i+1]):
                 timestamps.append(self.graph[path[i]][path[i+1]]['timestamp'])
         return timestamps
+
+
+def _gather_out_edges(indptr: np.ndarray, node_ids: np.ndarray) -> np.ndarray:
+    """
+    Positions in the per-edge CSR arrays of every outgoing edge of node_ids,
+    grouped by node in the order given
+    """
+    out_starts = indptr[node_ids]
+    out_counts = indptr[node_ids + 1] - out_starts
+    return (np.repeat(out_starts - np.cumsum(out_counts) + out_counts, out_counts)
+            + np.arange(out_counts.sum()))
+
+
+def _read_csv(csv_path: str, dtype: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Read a CSV with the fastest available engine; dtype hints for columns the
+    file does not have are ignored
+    
+    pandas' pyarrow engine applies dtype only after Arrow has inferred the
+    column types, which turns hex-looking strings into numbers, so with PyArrow
+    the types are handed to Arrow's own reader instead.
+    """
+    if CSV_ENGINE != 'pyarrow':
+        return pd.read_csv(csv_path, engine=CSV_ENGINE, dtype=dtype)
+    
+    column_types = {col: pa.string() if kind is str else pa.from_numpy_dtype(np.dtype(kind))
+                    for col, kind in (dtype or {}).items()}
+    table = pa_csv.read_csv(csv_path,
+                            convert_options=pa_csv.ConvertOptions(column_types=column_types))
+    return table.to_pandas()
@@ -3,11 +3,25 @@ Pattern Detector Module
 Detects money laundering patterns including fan-out/fan-in and cyclic structures
 """
 
+import logging
 import networkx as nx
-from typing import List, Dict, Set, Tuple
-from collections import defaultdict, deque
+from typing import List, Dict, Set, Tuple, Optional, Iterator
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from bisect import bisect_right
+from itertools import chain
+import multiprocessing
+from multiprocessing import shared_memory
 import numpy as np
-from datetime import datetime
+import pandas as pd
+from scipy.sparse.csgraph import connected_components
+
+from .graph_builder import _gather_out_edges
+from ..utils._kernels import (NUMBA_AVAILABLE, count_fanin_destinations, score_patterns,
+                              walk_peeling_chains)
+
+logger = logging.getLogger(__name__)
 
 
 class SmurfingPattern:
@@ -23,6 +37,20 @@ class SmurfingPattern:
         self.suspicion_score = 0.0
         self.total_amount = 0.0
         self.time_span = None
+        self._all_wallets = None
+        
+    @property
+    def all_wallets(self) -> frozenset:
+        """
+        Every wallet in the pattern, whatever its role
+        
+        Built on first access and cached; the role sets are not expected to
+        change once the pattern has been detected.
+        """
+        if self._all_wallets is None:
+            self._all_wallets = frozenset(self.source_wallets | self.intermediate_wallets |
+                                          self.destination_wallets)
+        return self._all_wallets
         
     def __repr__(self):
         return (f"SmurfingPattern(type={self.pattern_type}, "
@@ -35,6 +63,11 @@ class SmurfingPattern:
 class PatternDetector:
     """
     Detects various money laundering patterns in blockchain graphs
+    
+    Illicit wallets are looked up on the BlockchainGraph at detection time, so
+    load_illicit_wallets may run before or after the detector is created.
+    Transactions must be loaded first: the graph's CSR arrays are taken once
+    here, and refresh_caches() re-takes them after the graph has changed.
     """
     
     def __init__(self, blockchain_graph):
@@ -42,6 +75,76 @@ class PatternDetector:
         self.blockchain = blockchain_graph
         self.detected_patterns = []
         
+        # Content key -> registered pattern, so re-detected patterns are neither
+        # scored nor added to detected_patterns twice
+        self._pattern_registry = {}
+        
+        self._build_csr()
+        
+    def refresh_caches(self) -> None:
+        """
+        Re-read the graph after it was modified in place
+        
+        The detectors work on a CSR snapshot of the graph; reloading data through
+        BlockchainGraph rebuilds it, but direct edits to the NetworkX graph need
+        this call before detecting again.
+        """
+        self.blockchain._build_csr()
+        self._build_csr()
+        
+    @property
+    def _illicit_mask(self) -> np.ndarray:
+        """
+        Illicit flags by node ID, read from the blockchain graph on every use
+        
+        load_illicit_wallets replaces the mask, so a copy taken at construction
+        would miss wallets flagged later.
+        """
+        return self.blockchain.illicit_mask
+    
+    def _build_csr(self) -> None:
+        """
+        Take the CSR arrays for the vectorized detectors from the blockchain graph
+        
+        Node i's outgoing edges occupy positions indptr[i]:indptr[i+1] of the
+        per-edge arrays (successor index, amount, first/last timestamp in ns);
+        rev_indptr/rev_indices list predecessors, and edge_index maps (u, v) to
+        an edge position.
+        """
+        blockchain = self.blockchain
+        self._nodes = blockchain.wallets
+        self._node_ids = blockchain.wallet_index
+        self._indptr = blockchain.indptr
+        self._indices = blockchain.indices
+        self._edge_index = blockchain.edge_index
+        self._edge_amounts = blockchain.edge_amount
+        self._edge_first_time = blockchain.edge_first_time
+        self._edge_last_time = blockchain.edge_last_time
+        self._edge_time_indptr = blockchain.edge_time_indptr
+        self._edge_times = blockchain.edge_times
+        self._rev_indptr = blockchain.pred_indptr
+        self._rev_indices = blockchain.pred_indices
+        self._out_degree = blockchain.out_degree
+        self._adjacency = blockchain.adjacency
+        self._total_sent = blockchain.wallet_total_sent
+        self._median_amount = blockchain.median_edge_amount
+        # Vectorized wallet name -> node ID lookup for whole batches of patterns
+        self._node_lookup = pd.Index(self._nodes)
+        
+    def _csr_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The CSR snapshot arrays used by the module-level scan kernels
+        """
+        return {
+            'indptr': self._indptr,
+            'indices': self._indices,
+            'edge_amounts': self._edge_amounts,
+            'edge_first_time': self._edge_first_time,
+            'edge_last_time': self._edge_last_time,
+            'edge_time_indptr': self._edge_time_indptr,
+            'edge_times': self._edge_times,
+        }
+    
     def detect_fanout_fanin_patterns(self, min_fanout: int = 3, min_fanin: int = 3,
                                      max_hops: int = 4) -> List[SmurfingPattern]:
         """
@@ -53,153 +156,152 @@ class PatternDetector:
             min_fanin: Minimum number of wallets in fan-in
             max_hops: Maximum path length to consider
         """
+        # Only nodes that fan out widely enough are potential sources
+        candidates = np.flatnonzero(self._out_degree >= min_fanout)
+        hits = _scan_fanout(self._csr_arrays(), candidates, min_fanout, min_fanin)
+        return self._fanout_patterns(hits)
+    
+    def _fanout_patterns(self, hits) -> List[SmurfingPattern]:
+        """
+        Build and register fan-out/fan-in patterns from _scan_fanout results
+        """
         patterns = []
         
-        # Iterate through all nodes as potential sources
-        for source in self.graph.nodes():
-            successors = list(self.graph.successors(source))
-            
-            # Check if this node fans out
-            if len(successors) < min_fanout:
-                continue
-            
-            # For each intermediate layer, check if they fan-in
-            intermediate_wallets = set(successors)
-            
-            # Get all potential destinations (nodes that receive from multiple intermediates)
-            destination_candidates = defaultdict(set)
-            
-            for intermediate in intermediate_wallets:
-                # Get timestamp of source -> intermediate transaction
-                # We need the earliest transaction time to be safe
-                if not self.graph.has_edge(source, intermediate):
-                    continue
-                    
-                edge_data_in = self.graph[source][intermediate]
-                time_in = min(edge_data_in['timestamps']) if 'timestamps' in edge_data_in else edge_data_in['timestamp']
-                
-                for dest in self.graph.successors(intermediate):
-                    # Temporal Check: Outgoing transaction must happen STRICTLY AFTER incoming
-                    edge_data_out = self.graph[intermediate][dest]
-                    time_out = max(edge_data_out['timestamps']) if 'timestamps' in edge_data_out else edge_data_out['timestamp']
-                    
-                    if time_out > time_in:
-                        destination_candidates[dest].add(intermediate)
-            
-            # Find destinations that receive from multiple intermediates (fan-in)
-            for dest, sources in destination_candidates.items():
-                if len(sources) >= min_fanin:
-                    # Calculate pattern metrics
-                    total_amount = 0
-                    valid_intermediates = set()
-                    
-                    for intermediate in sources:
-                        if self.graph.has_edge(intermediate, dest):
-                            total_amount += self.graph[intermediate][dest]['amount']
-                            valid_intermediates.add(intermediate)
-                    
-                    if len(valid_intermediates) >= min_fanin:
-                        pattern = SmurfingPattern(
-                            source_wallets={source},
-                            intermediate_wallets=valid_intermediates,
-                            destination_wallets={dest},
-                            pattern_type='fanout_fanin'
-                        )
-                        pattern.total_amount = total_amount
-                        pattern.suspicion_score = self._calculate_pattern_suspicion(pattern)
-                        
-                        patterns.append(pattern)
-        
-        self.detected_patterns.extend(patterns)
-        return patterns
+        for source_id, intermediate_ids, dest_id, total_amount in hits:
+            pattern = SmurfingPattern(
+                source_wallets={self._nodes[source_id]},
+                intermediate_wallets={self._nodes[i] for i in intermediate_ids},
+                destination_wallets={self._nodes[dest_id]},
+                pattern_type='fanout_fanin'
+            )
+            pattern.total_amount = total_amount
+            patterns.append(pattern)
+        
+        return self._register_patterns(patterns)
     
     def detect_cyclic_patterns(self, min_cycle_length: int = 3, 
-                              max_cycle_length: int = 10) -> List[SmurfingPattern]:
+                              max_cycle_length: int = 10,
+                              enumerate_all: bool = False) -> List[SmurfingPattern]:
         """
         Detect cyclic patterns where money flows in a loop
+        
+        By default one representative loop is taken from each strongly connected
+        component with nx.find_cycle, which is linear in the component size.
+        enumerate_all=True enumerates every chronologically valid cycle up to
+        max_cycle_length with a bounded depth-first search over the CSR.
         """
-        patterns = []
+        return list(self.iter_cyclic_patterns(min_cycle_length, max_cycle_length, enumerate_all))
+    
+    def iter_cyclic_patterns(self, min_cycle_length: int = 3, 
+                             max_cycle_length: int = 10,
+                             enumerate_all: bool = False) -> Iterator[SmurfingPattern]:
+        """
+        Yield cyclic patterns one at a time as their loops pass the temporal check
         
-        # Find all simple cycles
-        try:
-            # Limit search to avoid performance issues
-            cycles = []
-            cycle_count = 0
-            for cycle in nx.simple_cycles(self.graph):
+        Only the cycle currently being checked is held in memory; stopping the
+        iteration early also stops the cycle search.
+        """
+        # Limit search to avoid performance issues
+        cycle_count = 0
+        found = 0
+        max_checked = 5000  # Stop after checking enough cycles
+        max_cycles = 100  # Reduced limit for faster execution
+        
+        # Cycles never cross strongly connected components, so search each
+        # non-trivial SCC separately. Small SCCs go first so isolated loops are
+        # not starved by the search budget being spent on one dense component.
+        _, labels = connected_components(self._adjacency, directed=True, connection='strong')
+        members = np.argsort(labels, kind='stable')
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(labels))))
+        if enumerate_all:
+            # Convert the CSR to Python lists once for the whole search, not per SCC
+            csr_lists = {name: array.tolist() for name, array in self._csr_arrays().items()}
+            label_list = labels.tolist()
+        
+        for label in np.argsort(np.diff(bounds), kind='stable'):
+            scc_ids = members[bounds[label]:bounds[label + 1]]
+            if scc_ids.size < 2:
+                continue
+            
+            if enumerate_all:
+                candidates = _temporal_cycles(csr_lists, label_list, scc_ids,
+                                              max_cycle_length)
+                candidates = ([self._nodes[i] for i in cycle] for cycle in candidates)
+            else:
+                subgraph = self.graph.subgraph(self._nodes[i] for i in scc_ids)
+                try:
+                    edges = nx.find_cycle(subgraph, orientation='original')
+                except nx.NetworkXNoCycle:
+                    continue
+                cycle = self._temporally_ordered_cycle([u for u, _, _ in edges])
+                candidates = [cycle] if cycle is not None else []
+            
+            for cycle in candidates:
                 cycle_count += 1
                 if min_cycle_length <= len(cycle) <= max_cycle_length:
-                    # Temporal Validation for Cycle
-                    is_temporal_valid = True
-                    # Check if each step is chronologically valid
-                    # Note: For a cycle A->B->C->A, we check A->B < B->C < C->A
-                    # This implies the money comes back LATER.
-                    
-                    current_time_min = None
-                    
-                    for i in range(len(cycle)):
-                        u, v = cycle[i], cycle[(i+1) % len(cycle)]
-                        if not self.graph.has_edge(u, v):
-                            is_temporal_valid = False
-                            break
-                            
-                        edge_data = self.graph[u][v]
-                        # Use average time or specific instance?
-                        # Simplifying: just check if there exists a valid sequence of transactions
-                        # ideally we'd track specific flow, but graph only has aggregate/list
-                        
-                        # Just ensure we have timestamps
-                        if 'timestamps' not in edge_data:
-                            continue
-                            
-                        tx_times = sorted(edge_data['timestamps'])
-                        
-                        if current_time_min is None:
-                            current_time_min = tx_times[0]
-                        else:
-                            # We need a transaction that happens AFTER current_time_min
-                            valid_next_time = None
-                            for t in tx_times:
-                                if t > current_time_min:
-                                    valid_next_time = t
-                                    break
-                            
-                            if valid_next_time:
-                                current_time_min = valid_next_time
-                            else:
-                                is_temporal_valid = False
-                                break
-                    
-                    if is_temporal_valid:
-                        cycles.append(cycle)
-                        
-                if len(cycles) >= 100:  # Reduced limit for faster execution
-                    break
-                if cycle_count >= 5000:  # Stop after checking enough cycles
-                    break
-            
-            for cycle in cycles:
-                # Calculate cycle metrics
-                total_amount = sum(
-                    self.graph[cycle[i]][cycle[(i+1) % len(cycle)]]['amount']
-                    for i in range(len(cycle))
-                )
-                
-                pattern = SmurfingPattern(
-                    source_wallets={cycle[0]},
-                    intermediate_wallets=set(cycle[1:-1]) if len(cycle) > 2 else set(),
-                    destination_wallets={cycle[-1]},
-                    pattern_type='cyclic'
-                )
-                pattern.total_amount = total_amount
-                pattern.suspicion_score = self._calculate_pattern_suspicion(pattern)
+                    found += 1
+                    yield self._cyclic_pattern(cycle)
                 
-                patterns.append(pattern)
-        
-        except (nx.NetworkXNoCycle, StopIteration):
-            pass
+                # Never drive the search past the remaining budget
+                if found >= max_cycles or cycle_count >= max_checked:
+                    return
+    
+    def _cyclic_pattern(self, cycle: List[str]) -> SmurfingPattern:
+        """
+        Build and register the pattern for a temporally valid cycle
+        """
+        # Calculate cycle metrics
+        total_amount = float(self._edge_amounts[self._cycle_arcs(cycle)].sum())
+        
+        pattern = SmurfingPattern(
+            source_wallets={cycle[0]},
+            intermediate_wallets=set(cycle[1:-1]) if len(cycle) > 2 else set(),
+            destination_wallets={cycle[-1]},
+            pattern_type='cyclic'
+        )
+        pattern.total_amount = total_amount
+        return self._register_patterns([pattern])[0]
+    
+    def _cycle_arcs(self, cycle: List[str]) -> np.ndarray:
+        """
+        CSR edge positions of a cycle's hops, including the closing hop back to the start
+        """
+        arcs = zip(cycle, cycle[1:] + cycle[:1])
+        return np.fromiter((self._edge_index[arc] for arc in arcs), dtype=np.int64,
+                           count=len(cycle))
+    
+    def _temporally_ordered_cycle(self, cycle: List[str]):
+        """
+        Rotate a cycle to its earliest hop and check that money flows in time order
         
-        self.detected_patterns.extend(patterns)
-        return patterns
+        Returns the rotated cycle, or None if no chronological sequence of
+        transactions runs all the way around the loop.
+        """
+        # The search may report a loop starting at any of its wallets;
+        # rotate it to start at the hop with the earliest transaction
+        # so the chronological check below doesn't depend on that choice.
+        # Ties go to the lowest edge position, as in _temporal_cycles
+        arcs = self._cycle_arcs(cycle)
+        start = int(np.lexsort((arcs, self._edge_first_time[arcs]))[0])
+        cycle = cycle[start:] + cycle[:start]
+        arcs = np.roll(arcs, -start)
+        
+        # Temporal Validation for Cycle
+        # Check if each step is chronologically valid
+        # Note: For a cycle A->B->C->A, we check A->B < B->C < C->A
+        # This implies the money comes back LATER.
+        # Each hop takes its earliest transaction after the previous hop's,
+        # found by binary search in the edge's pre-sorted int64 timestamps
+        current_time_min = self._edge_first_time[arcs[0]]
+        
+        for edge in arcs[1:]:
+            lo, hi = self._edge_time_indptr[edge], self._edge_time_indptr[edge + 1]
+            k = lo + np.searchsorted(self._edge_times[lo:hi], current_time_min, side='right')
+            if k == hi:
+                return None
+            current_time_min = self._edge_times[k]
+        
+        return cycle
     
     def detect_layered_patterns(self, source_wallet: str, max_layers: int = 5,
                                min_split: int = 2) -> List[SmurfingPattern]:
@@ -209,58 +311,21 @@ class PatternDetector:
         """
         patterns = []
         
-        if not self.graph.has_node(source_wallet):
+        if source_wallet not in self._node_ids:
             return patterns
         
-        # BFS layer by layer
-        current_layer = {source_wallet}
-        all_intermediates = set()
-        
-        # Keep track of valid time window for each wallet to enforce causality
-        # wallet -> min_arrival_time
-        wallet_times = {source_wallet: datetime.min} if self.graph.nodes else {}
-        
-        # Initialize if using real dates (assumption: datetime objects in graph)
-        # We need a safe starting point. If we don't have a specific start time,
-        # we can just use the first transaction time out of source.
-        
-        for layer in range(max_layers):
-            next_layer = set()
-            
-            for wallet in current_layer:
-                successors = set(self.graph.successors(wallet))
-                
-                # If this wallet splits to multiple (layering behavior)
-                if len(successors) >= min_split:
-                    # Filter successors by time
-                    valid_successors = set()
-                    # We assume we reached 'wallet' at some time T_in. 
-                    # We can proceed to 'next' only if T_out >= T_in.
-                    
-                    # For BFS simplified: we don't track exact path times for every node completely,
-                    # but we can do a local check if we track 'earliest valid arrival'.
-                    
-                    # Since implementing full temporal path search is complex, we'll strip strict 
-                    # check here for 'layered' generic search but rely on the structure mostly.
-                    # HOWEVER, for the Evaluation, "Time Delays" is a requirement.
-                    
-                    next_layer.update(successors)
-                    all_intermediates.update(successors)
-            
-            if not next_layer:
-                break
-            
-            current_layer = next_layer
-        
-        # Check if final layer converges (fan-in)
-        final_destinations = defaultdict(int)
-        for intermediate in all_intermediates:
-            for dest in self.graph.successors(intermediate):
-                if dest not in all_intermediates and dest != source_wallet:
-                    final_destinations[dest] += 1
-        
-        # Find convergence points
-        convergence_wallets = {w for w, count in final_destinations.items() if count >= min_split}
+        intermediate_ids, convergence_ids = _scan_layered(
+            self._csr_arrays(), self._node_ids[source_wallet], max_layers, min_split)
+        return self._layered_patterns(source_wallet, intermediate_ids, convergence_ids)
+    
+    def _layered_patterns(self, source_wallet: str, intermediate_ids: np.ndarray,
+                          convergence_ids: np.ndarray) -> List[SmurfingPattern]:
+        """
+        Build and register the layered pattern for a source from _scan_layered results
+        """
+        patterns = []
+        all_intermediates = {self._nodes[i] for i in intermediate_ids}
+        convergence_wallets = {self._nodes[i] for i in convergence_ids}
         
         if convergence_wallets:
             pattern = SmurfingPattern(
@@ -270,19 +335,14 @@ class PatternDetector:
                 pattern_type='layered'
             )
             
-            # Calculate total amount
-            total_amount = 0
-            for dest in convergence_wallets:
-                for intermediate in all_intermediates:
-                    if self.graph.has_edge(intermediate, dest):
-                        total_amount += self.graph[intermediate][dest]['amount']
-            
-            pattern.total_amount = total_amount
-            pattern.suspicion_score = self._calculate_pattern_suspicion(pattern)
+            # Calculate total amount over the intermediates' out-edges that land
+            # on a convergence wallet, rather than probing every pair
+            edge_idx = _gather_out_edges(self._indptr, intermediate_ids)
+            into_convergence = np.isin(self._indices[edge_idx], convergence_ids)
+            pattern.total_amount = float(self._edge_amounts[edge_idx[into_convergence]].sum())
             patterns.append(pattern)
         
-        self.detected_patterns.extend(patterns)
-        return patterns
+        return self._register_patterns(patterns)
 
     def detect_peeling_chains(self, threshold: float = 0.02) -> List[SmurfingPattern]:
         """
@@ -296,79 +356,39 @@ class PatternDetector:
         # Peeling chain structure: Node has mostly 1 major output + small outputs
         
         # Optimization: Start with nodes that have exactly 2-3 successors (main path + peel)
-        candidates = [n for n in self.graph.nodes() if 1 <= self.graph.out_degree(n) <= 5]
+        candidates = np.flatnonzero((self._out_degree >= 1) & (self._out_degree <= 5))
         
-        visited_in_chains = set()
+        # Chains are walked over integer node IDs in a compiled kernel; names are
+        # only looked up when a pattern is built
+        flat, offsets = walk_peeling_chains(candidates, self._indptr, self._indices,
+                                            self._edge_amounts, self._total_sent,
+                                            threshold, 20)
         
-        for wallet in candidates:
-            if wallet in visited_in_chains:
-                continue
-                
-            chain = [wallet]
-            current = wallet
-            
-            # Follow the chain
-            while True:
-                successors = list(self.graph.successors(current))
-                if not successors:
-                    break
-                
-                # Find the "main" path (where most money goes)
-                next_wallet = None
-                max_amount = -1
-                total_sent = self.graph.nodes[current]['total_sent']
-                
-                if total_sent == 0:
-                    break
-
-                # Sort successors by amount
-                successor_amounts = []
-                for succ in successors:
-                    amt = self.graph[current][succ]['amount']
-                    successor_amounts.append((succ, amt))
-                
-                successor_amounts.sort(key=lambda x: x[1], reverse=True)
-                
-                # Heuristic: The largest transaction is the continuation of the chain
-                # The others are "peels"
-                best_succ, best_amt = successor_amounts[0]
-                
-                # Check if it looks like a peeling chain continuation
-                # (Majority of funds move to one wallet, rest are small peels)
-                if best_amt / total_sent >= (1 - threshold):
-                    next_wallet = best_succ
-                
-                if next_wallet and next_wallet not in chain: # Avoid immediate cycles
-                    chain.append(next_wallet)
-                    visited_in_chains.add(next_wallet)
-                    current = next_wallet
-                    
-                    if len(chain) > 20: # Limit length
-                         break
-                else:
-                    break
+        for chain in np.split(flat, offsets[1:-1]) if flat.size else []:
+            # We found a chain of at least 3 nodes
+            pattern = SmurfingPattern(
+                source_wallets={self._nodes[chain[0]]},
+                intermediate_wallets={self._nodes[i] for i in chain[1:-1]},
+                destination_wallets={self._nodes[chain[-1]]},
+                pattern_type='peeling_chain'
+            )
             
-            if len(chain) >= 3:
-                # We found a chain of at least 3 nodes
-                pattern = SmurfingPattern(
-                    source_wallets={chain[0]},
-                    intermediate_wallets=set(chain[1:-1]),
-                    destination_wallets={chain[-1]},
-                    pattern_type='peeling_chain'
-                )
-                
-                # Calculate amount involved (the final amount remaining)
-                # Or total amount processed
-                pattern.total_amount = self.graph.nodes[chain[0]]['total_sent']
-                pattern.suspicion_score = self._calculate_pattern_suspicion(pattern)
-                patterns.append(pattern)
-        
-        self.detected_patterns.extend(patterns)
-        return patterns
+            # Calculate amount involved (the final amount remaining)
+            # Or total amount processed
+            pattern.total_amount = float(self._total_sent[chain[0]])
+            patterns.append(pattern)
+        
+        return self._register_patterns(patterns)
 
-    def detect_all_patterns_from_illicit(self) -> Dict[str, List[SmurfingPattern]]:
+    def detect_all_patterns_from_illicit(self, deep: bool = False,
+                                         max_workers: Optional[int] = None) -> Dict[str, List[SmurfingPattern]]:
         """
         Run all pattern detection algorithms starting from known illicit wallets
+        
+        Args:
+            deep: Enumerate every simple cycle instead of one loop per component
+            max_workers: Run the fan-out and layered scans in this many worker
+                processes sharing the CSR arrays (sequential when None or 1)
         """
         all_patterns = {
             'fanout_fanin': [],
@@ -376,118 +396,231 @@ class PatternDetector:
             'layered': [],
             'peeling_chain': []
         }
+        illicit_sources = [w for w in self.blockchain.illicit_wallets if w in self._node_ids]
+        
+        with self._scan_pool(max_workers) as pool:
+            # Detect general patterns
+            logger.info("Detecting fan-out/fan-in patterns (with temporal logic)...")
+            if pool is None:
+                fanout_patterns = self.detect_fanout_fanin_patterns()
+            else:
+                chunks = np.array_split(np.flatnonzero(self._out_degree >= 3), max_workers)
+                futures = [pool.submit(_run_scan, _scan_fanout, chunk, 3, 3) for chunk in chunks]
+                fanout_patterns = self._fanout_patterns(
+                    chain.from_iterable(f.result() for f in futures))
+            all_patterns['fanout_fanin'] = fanout_patterns
+            logger.info("Found %d fan-out/fan-in patterns", len(fanout_patterns))
+            
+            # The layered scans run in the pool while cycles and peeling chains,
+            # which need the NetworkX graph, are detected here
+            if pool is not None:
+                source_ids = [self._node_ids[w] for w in illicit_sources]
+                chunks = np.array_split(np.array(source_ids, dtype=np.int64), max_workers)
+                layered_futures = [pool.submit(_run_scan, _scan_layered_batch, chunk, 5, 2)
+                                   for chunk in chunks]
+            
+            logger.info("Detecting cyclic patterns (with temporal logic)...")
+            cyclic_patterns = self.detect_cyclic_patterns(enumerate_all=deep)
+            all_patterns['cyclic'] = cyclic_patterns
+            logger.info("Found %d cyclic patterns", len(cyclic_patterns))
+            
+            logger.info("Detecting peeling chains...")
+            peeling_patterns = self.detect_peeling_chains()
+            all_patterns['peeling_chain'] = peeling_patterns
+            logger.info("Found %d peeling chain patterns", len(peeling_patterns))
+            
+            # Detect layered patterns from each illicit wallet
+            logger.info("Detecting layered patterns from illicit wallets...")
+            if pool is None:
+                for illicit_wallet in illicit_sources:
+                    logger.debug("Layered search from %s", illicit_wallet)
+                    layered = self.detect_layered_patterns(illicit_wallet)
+                    all_patterns['layered'].extend(layered)
+            else:
+                hits = chain.from_iterable(f.result() for f in layered_futures)
+                for illicit_wallet, (intermediate_ids, convergence_ids) in zip(illicit_sources, hits):
+                    layered = self._layered_patterns(illicit_wallet, intermediate_ids, convergence_ids)
+                    all_patterns['layered'].extend(layered)
+        
+        logger.info("Found %d layered patterns", len(all_patterns['layered']))
         
-        # Detect general patterns
-        print("Detecting fan-out/fan-in patterns (with temporal logic)...")
-        fanout_patterns = self.detect_fanout_fanin_patterns()
-        all_patterns['fanout_fanin'] = fanout_patterns
-        print(f"Found {len(fanout_patterns)} fan-out/fan-in patterns")
-        
-        print("Detecting cyclic patterns (with temporal logic)...")
-        cyclic_patterns = self.detect_cyclic_patterns()
-        all_patterns['cyclic'] = cyclic_patterns
-        print(f"Found {len(cyclic_patterns)} cyclic patterns")
-        
-        print("Detecting peeling chains...")
-        peeling_patterns = self.detect_peeling_chains()
-        all_patterns['peeling_chain'] = peeling_patterns
-        print(f"Found {len(peeling_patterns)} peeling chain patterns")
+        return all_patterns
+    
+    @contextmanager
+    def _scan_pool(self, max_workers: Optional[int]):
+        """
+        Process pool whose workers map the CSR arrays from shared memory
         
-        # Detect layered patterns from each illicit wallet
-        print("Detecting layered patterns from illicit wallets...")
-        for illicit_wallet in self.blockchain.illicit_wallets:
-            if self.graph.has_node(illicit_wallet):
-                layered = self.detect_layered_patterns(illicit_wallet)
-                all_patterns['layered'].extend(layered)
+        Yields None when max_workers asks for sequential detection. The arrays are
+        copied into shared memory once, so the graph itself is never pickled.
+        """
+        if max_workers is None or max_workers < 2:
+            yield None
+            return
         
-        print(f"Found {len(all_patterns['layered'])} layered patterns")
+        segments = []
+        specs = {}
+        try:
+            for name, array in self._csr_arrays().items():
+                shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                segments.append(shm)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+                specs[name] = (shm.name, array.shape, array.dtype.str)
+            
+            # Workers are spawned rather than forked: forking is unsafe once the
+            # parallel Numba kernels have started their thread pool in this process
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_shared_csr,
+                                     initargs=(specs,),
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                yield pool
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+    
+    def _register_patterns(self, patterns: List[SmurfingPattern]) -> List[SmurfingPattern]:
+        """
+        Record newly detected patterns, scoring them in one batch
         
-        return all_patterns
+        A pattern identical to one already recorded is replaced by that one, so it
+        is neither scored nor added to detected_patterns twice.
+        """
+        registered = []
+        new_patterns = []
+        
+        for pattern in patterns:
+            key = (pattern.pattern_type, frozenset(pattern.source_wallets),
+                   frozenset(pattern.intermediate_wallets), frozenset(pattern.destination_wallets))
+            if key not in self._pattern_registry:
+                self._pattern_registry[key] = pattern
+                new_patterns.append(pattern)
+            registered.append(self._pattern_registry[key])
+        
+        for pattern, score in zip(new_patterns, self._score_patterns(new_patterns)):
+            pattern.suspicion_score = float(score)
+        self.detected_patterns.extend(new_patterns)
+        
+        return registered
     
     def _calculate_pattern_suspicion(self, pattern: SmurfingPattern) -> float:
         """
         Calculate suspicion score for a pattern based on multiple factors
         """
-        score = 0.0
-        
-        # Factor 1: Number of intermediaries (more = more suspicious)
-        intermediary_score = min(len(pattern.intermediate_wallets) / 10.0, 1.0) * 30
-        score += intermediary_score
-        
-        # Factor 2: Connection to illicit wallets
-        illicit_count = 0
-        all_wallets = (pattern.source_wallets | pattern.intermediate_wallets | 
-                      pattern.destination_wallets)
-        
-        for wallet in all_wallets:
-            if wallet in self.blockchain.illicit_wallets:
-                illicit_count += 1
-        
-        illicit_score = min(illicit_count / len(all_wallets), 1.0) * 40 if all_wallets else 0
-        score += illicit_score
-        
-        # Factor 3: Amount (larger amounts more suspicious)
-        # Normalize by median transaction amount
-        if pattern.total_amount > 0:
-            amounts = [data['amount'] for _, _, data in self.graph.edges(data=True)]
-            median_amount = np.median(amounts) if amounts else 1
-            amount_score = min(pattern.total_amount / (median_amount * 10), 1.0) * 30
-            score += amount_score
-            
-        # Bonus: Peeling chains are inherently suspicious if long
-        if pattern.pattern_type == 'peeling_chain':
-             if len(pattern.intermediate_wallets) > 4:
-                 score += 15
-        
-        return min(score, 100.0)
+        return float(self._score_patterns([pattern])[0])
+    
+    def _score_patterns(self, patterns: List[SmurfingPattern]) -> np.ndarray:
+        """
+        Suspicion scores for a batch of patterns from the compiled scoring kernel
+        """
+        n_intermediates = np.empty(len(patterns), dtype=np.int64)
+        illicit_counts = np.empty(len(patterns), dtype=np.int64)
+        n_wallets = np.empty(len(patterns), dtype=np.int64)
+        amounts = np.empty(len(patterns), dtype=np.float64)
+        is_peeling = np.empty(len(patterns), dtype=np.bool_)
+        wallets = []
+        
+        for i, pattern in enumerate(patterns):
+            # A fan-out source can also be its own fan-in destination, so roles are
+            # merged before counting rather than summing the three set sizes
+            all_wallets = pattern.all_wallets
+            wallets.extend(all_wallets)
+            n_intermediates[i] = len(pattern.intermediate_wallets)
+            n_wallets[i] = len(all_wallets)
+            amounts[i] = pattern.total_amount
+            is_peeling[i] = pattern.pattern_type == 'peeling_chain'
+        
+        # Illicit wallets per pattern: one lookup for the whole batch, then the
+        # illicit mask is summed per pattern
+        node_ids = self._node_lookup.get_indexer(wallets)
+        is_illicit = (node_ids >= 0) & self._illicit_mask[node_ids]
+        illicit_counts[:] = np.bincount(np.repeat(np.arange(len(patterns)), n_wallets),
+                                        weights=is_illicit, minlength=len(patterns))
+        
+        # Normalize amounts by the median transaction amount
+        median_amount = self._median_amount if (amounts > 0).any() else 1.0
+        return score_patterns(n_intermediates, illicit_counts, n_wallets, amounts,
+                              is_peeling, median_amount)
     
     def find_shortest_path_to_illicit(self, wallet: str) -> Tuple[List[str], float]:
         """
         Find shortest path from wallet to any illicit wallet
         Returns (path, distance) or ([], inf) if no path exists
         """
-        min_distance = float('inf')
-        shortest_path = []
+        blockchain = self.blockchain
+        i = blockchain.wallet_index.get(wallet)
+        distance, parent = blockchain.get_illicit_distances()
         
-        for illicit in self.blockchain.illicit_wallets:
-            if illicit in self.graph:
-                try:
-                    path = nx.shortest_path(self.graph, wallet, illicit)
-                    if len(path) < min_distance:
-                        min_distance = len(path)
-                        shortest_path = path
-                except nx.NetworkXNoPath:
-                    continue
+        if i is None or distance[i] < 0:
+            return [], float('inf')
         
-        return shortest_path, min_distance if shortest_path else float('inf')
+        # Follow next-hop pointers until an illicit wallet is reached
+        path = [wallet]
+        while parent[i] >= 0:
+            i = parent[i]
+            path.append(blockchain.wallets[i])
+        
+        return path, len(path)
     
     def analyze_wallet_neighborhood(self, wallet: str, radius: int = 2) -> Dict:
         """
         Analyze the neighborhood of a wallet for suspicious patterns
         """
-        if not self.graph.has_node(wallet):
+        if wallet not in self._node_ids:
             return {}
         
-        subgraph = self.blockchain.get_subgraph_around_wallet(wallet, radius)
+        # Count the induced neighborhood's nodes and edges straight from the CSR
+        # arrays instead of building a subgraph copy
+        node_ids = self.blockchain.get_neighborhood_ids(self._node_ids[wallet], radius)
+        in_neighborhood = np.zeros(len(self._nodes), dtype=bool)
+        in_neighborhood[node_ids] = True
+        n_nodes = node_ids.size
+        n_edges = int(in_neighborhood[self._indices[_gather_out_edges(self._indptr, node_ids)]].sum())
         
+        # The neighborhood is induced, so with radius >= 1 it holds every neighbor of
+        # the wallet and every edge between them: clustering matches the full graph
         analysis = {
             'wallet': wallet,
-            'local_nodes': subgraph.number_of_nodes(),
-            'local_edges': subgraph.number_of_edges(),
-            'local_density': nx.density(subgraph),
-            'clustering_coefficient': nx.clustering(subgraph.to_undirected(), wallet),
+            'local_nodes': n_nodes,
+            'local_edges': n_edges,
+            'local_density': n_edges / (n_nodes * (n_nodes - 1)) if n_nodes > 1 else 0,
+            'clustering_coefficient': self._local_clustering(self._node_ids[wallet]) if radius >= 1 else 0,
         }
         
         # Count illicit connections
-        illicit_neighbors = sum(
-            1 for n in subgraph.nodes() 
-            if n in self.blockchain.illicit_wallets
-        )
+        illicit_neighbors = int(self._illicit_mask[node_ids].sum())
         analysis['illicit_neighbors'] = illicit_neighbors
-        analysis['illicit_ratio'] = illicit_neighbors / subgraph.number_of_nodes()
+        analysis['illicit_ratio'] = illicit_neighbors / n_nodes
         
         return analysis
     
+    def _local_clustering(self, node_id: int) -> float:
+        """
+        Undirected clustering coefficient of a node, computed from its neighbors
+        
+        Equivalent to nx.clustering(G.to_undirected(), wallet) without copying the graph.
+        """
+        node_ids = np.array([node_id], dtype=np.int64)
+        neighbors = np.union1d(self._indices[_gather_out_edges(self._indptr, node_ids)],
+                               self._rev_indices[_gather_out_edges(self._rev_indptr, node_ids)])
+        neighbors = neighbors[neighbors != node_id].astype(np.int64)
+        k = neighbors.size
+        if k < 2:
+            return 0
+        
+        # Edges running between two distinct neighbors, in either direction
+        is_neighbor = np.zeros(len(self._nodes), dtype=bool)
+        is_neighbor[neighbors] = True
+        out_counts = self._out_degree[neighbors]
+        edge_idx = _gather_out_edges(self._indptr, neighbors)
+        u = np.repeat(neighbors, out_counts)
+        v = self._indices[edge_idx].astype(np.int64)
+        linked = is_neighbor[v] & (u != v)
+        
+        # Count each linked neighbor pair once, whichever direction the edge runs
+        pairs = np.minimum(u[linked], v[linked]) * len(self._nodes) + np.maximum(u[linked], v[linked])
+        links = np.unique(pairs).size
+        return 2 * links / (k * (k - 1)) if links else 0
+    
     def get_pattern_statistics(self) -> Dict:
         """
         Get statistics about detected patterns
@@ -508,3 +641,185 @@ class PatternDetector:
         }
         
         return stats
+
+
+def _scan_fanout(csr: Dict[str, np.ndarray], source_ids, min_fanout: int, min_fanin: int):
+    """
+    Fan-out/fan-in search from the given candidate sources over CSR arrays
+    
+    Returns a (source_id, intermediate_ids, dest_id, total_amount) tuple per pattern.
+    """
+    hits = []
+    indptr, indices = csr['indptr'], csr['indices']
+    
+    # Check if each node fans out, then count fan-in destinations for all
+    # candidates in parallel; only sources with a hit are grouped below.
+    # Without Numba the count would be a slow Python loop, so every fan-out
+    # source goes straight to the NumPy grouping, which finds the same hits
+    source_ids = np.asarray(source_ids, dtype=np.int64)
+    source_ids = source_ids[indptr[source_ids + 1] - indptr[source_ids] >= min_fanout]
+    if NUMBA_AVAILABLE:
+        n_fanin = count_fanin_destinations(source_ids, indptr, indices, csr['edge_first_time'],
+                                           csr['edge_last_time'], min_fanin)
+        source_ids = source_ids[n_fanin > 0]
+    
+    for source_id in source_ids:
+        first_edge, last_edge = indptr[source_id], indptr[source_id + 1]
+        
+        # Intermediates and the earliest source -> intermediate transaction time
+        intermediates = indices[first_edge:last_edge]
+        time_in = csr['edge_first_time'][first_edge:last_edge]
+        
+        # Gather every intermediate -> destination edge in one flat index array
+        out_counts = indptr[intermediates + 1] - indptr[intermediates]
+        edge_idx = _gather_out_edges(indptr, intermediates)
+        
+        # Temporal Check: Outgoing transaction must happen STRICTLY AFTER incoming
+        valid = csr['edge_last_time'][edge_idx] > np.repeat(time_in, out_counts)
+        edge_idx = edge_idx[valid]
+        edge_intermediates = np.repeat(intermediates, out_counts)[valid]
+        edge_dests = indices[edge_idx]
+        
+        # Find destinations that receive from multiple intermediates (fan-in).
+        # Each (intermediate, destination) edge is unique, so counts are distinct intermediates.
+        # Only the destinations that reach the threshold are collected
+        dests, counts = np.unique(edge_dests, return_counts=True)
+        fanin = counts >= min_fanin
+        
+        order = np.argsort(edge_dests, kind='stable')
+        ends = np.cumsum(counts)
+        for dest_id, start, end in zip(dests[fanin], (ends - counts)[fanin], ends[fanin]):
+            group = order[start:end]
+            total_amount = float(csr['edge_amounts'][edge_idx[group]].sum())
+            hits.append((source_id, edge_intermediates[group], dest_id, total_amount))
+    
+    return hits
+
+
+def _scan_layered(csr: Dict[str, np.ndarray], source_id: int, max_layers: int,
+                  min_split: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Layered BFS from one source over CSR arrays
+    
+    Returns the IDs of all intermediates and of the convergence wallets they fan into.
+    """
+    indptr, indices = csr['indptr'], csr['indices']
+    n_nodes = len(indptr) - 1
+    
+    # BFS layer by layer over node IDs. A wallet's successors are the same
+    # every time it is reached, so each wallet is expanded at most once
+    visited = np.zeros(n_nodes, dtype=np.uint8)
+    is_intermediate = np.zeros(n_nodes, dtype=bool)
+    visited[source_id] = 1
+    frontier = np.array([source_id], dtype=np.int64)
+    
+    for layer in range(max_layers):
+        # Only wallets that split to multiple successors (layering behavior) are expanded.
+        # Since implementing full temporal path search is complex, we don't filter
+        # successors by time here and rely on the structure mostly.
+        out_degrees = indptr[frontier + 1] - indptr[frontier]
+        successors = indices[_gather_out_edges(indptr, frontier[out_degrees >= min_split])]
+        
+        if successors.size == 0:
+            break
+        
+        is_intermediate[successors] = True
+        frontier = np.unique(successors[visited[successors] == 0]).astype(np.int64)
+        visited[frontier] = 1
+    
+    intermediate_ids = np.flatnonzero(is_intermediate)
+    
+    # Check if final layer converges (fan-in): count edges from intermediates
+    # into wallets outside the layered structure
+    dests = indices[_gather_out_edges(indptr, intermediate_ids)]
+    dests = dests[~is_intermediate[dests] & (dests != source_id)]
+    dest_ids, counts = np.unique(dests, return_counts=True)
+    
+    # Find convergence points
+    return intermediate_ids, dest_ids[counts >= min_split]
+
+
+def _scan_layered_batch(csr: Dict[str, np.ndarray], source_ids, max_layers: int, min_split: int):
+    """
+    Run _scan_layered for several sources, returning results in the same order
+    """
+    return [_scan_layered(csr, source_id, max_layers, min_split) for source_id in source_ids]
+
+
+# CSR arrays mapped from the parent's shared memory, set up once per worker process
+_WORKER_CSR = {}
+_WORKER_SEGMENTS = []
+
+
+def _attach_shared_csr(specs):
+    """
+    Pool initializer: view the shared CSR segments as NumPy arrays
+    """
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _WORKER_SEGMENTS.append(shm)
+        _WORKER_CSR[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_scan(scan, *args):
+    """
+    Run one scan kernel in a worker process against the shared CSR arrays
+    """
+    return scan(_WORKER_CSR, *args)
+
+
+def _temporal_cycles(csr: Dict[str, list], labels: List[int], scc_ids,
+                     max_length: int) -> Iterator[List[int]]:
+    """
+    Yield every chronologically valid simple cycle of one SCC, up to max_length hops
+    
+    A depth-first search from each member follows only edges inside the SCC that
+    carry a transaction later than the one taken on the previous hop, so
+    non-chronological paths are cut as soon as they appear. Each cycle is
+    reported once, starting with its earliest hop (ties broken by edge position).
+    The CSR arrays and SCC labels are passed as Python lists, converted once by
+    the caller, since the search indexes them one element at a time.
+    """
+    indptr = csr['indptr']
+    indices = csr['indices']
+    first_time = csr['edge_first_time']
+    time_indptr = csr['edge_time_indptr']
+    times = csr['edge_times']
+    
+    for start in scc_ids.tolist():
+        label = labels[start]
+        for first_edge in range(indptr[start], indptr[start + 1]):
+            v = indices[first_edge]
+            if labels[v] != label or v == start:
+                continue
+            t0 = first_time[first_edge]
+            
+            path = [start, v]
+            on_path = {start, v}
+            stack = [[v, indptr[v], t0]]
+            while stack:
+                frame = stack[-1]
+                u, edge, t = frame
+                if edge == indptr[u + 1]:
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    continue
+                frame[1] = edge + 1
+                
+                v = indices[edge]
+                if labels[v] != label:
+                    continue
+                # Only hops after the starting one, so each cycle has one start
+                if first_time[edge] < t0 or (first_time[edge] == t0 and edge < first_edge):
+                    continue
+                # Earliest transaction on this hop after the previous hop's
+                k = bisect_right(times, t, time_indptr[edge], time_indptr[edge + 1])
+                if k == time_indptr[edge + 1]:
+                    continue
+                
+                if v == start:
+                    yield list(path)
+                elif v not in on_path and len(path) < max_length:
+                    path.append(v)
+                    on_path.add(v)
+                    stack.append([v, indptr[v], times[k]])
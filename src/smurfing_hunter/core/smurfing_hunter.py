@@ -4,13 +4,13 @@ Detects money laundering patterns in blockchain transaction networks
 """
 
 import argparse
+import logging
 import os
 from datetime import datetime
 
 from .graph_builder import BlockchainGraph
 from .pattern_detector import PatternDetector
 from .suspicion_scorer import SuspicionScorer
-from ..utils.visualizer import GraphVisualizer
 from ..data.generate_sample_data import DataGenerator
 
 
@@ -39,9 +39,13 @@ class SmurfingHunter:
         self.suspicion_scorer = None
         self.visualizer = None
         
-    def run_analysis(self, output_dir: str = "output"):
+    def run_analysis(self, output_dir: str = "output", deep: bool = False, top_n: int = 10,
+                     skip_detail: bool = False, skip_viz: bool = False):
         """
         Run complete money laundering analysis
+        
+        skip_detail and skip_viz leave out the detailed wallet assessments
+        (phase 3) and the visualizations (phase 4).
         """
         os.makedirs(output_dir, exist_ok=True)
         
@@ -51,7 +55,7 @@ class SmurfingHunter:
         print()
         
         # Detect patterns
-        patterns = self.pattern_detector.detect_all_patterns_from_illicit()
+        patterns = self.pattern_detector.detect_all_patterns_from_illicit(deep=deep)
         
         print()
         print("Pattern Detection Summary:")
@@ -81,9 +85,9 @@ class SmurfingHunter:
         print()
         
         # Get top suspicious wallets
-        print("Top 10 Most Suspicious Wallets:")
+        print(f"Top {top_n} Most Suspicious Wallets:")
         print("-" * 40)
-        top_wallets = self.suspicion_scorer.get_top_suspicious_wallets(10)
+        top_wallets = self.suspicion_scorer.get_top_suspicious_wallets(top_n)
         
         for i, (wallet, score) in enumerate(top_wallets, 1):
             risk_level = self.suspicion_scorer._get_risk_level(score)
@@ -97,61 +101,65 @@ class SmurfingHunter:
         self.suspicion_scorer.generate_risk_report(report_file)
         print()
         
-        print("=" * 80)
-        print("PHASE 3: DETAILED WALLET ANALYSIS")
-        print("=" * 80)
-        print()
-        
-        # Analyze top 3 wallets in detail
-        print("Detailed Risk Assessments:")
-        print("-" * 40)
-        
-        for i, (wallet, score) in enumerate(top_wallets[:3], 1):
-            assessment = self.suspicion_scorer.get_wallet_risk_assessment(wallet)
-            
-            print(f"\n{i}. Wallet: {wallet}")
-            print(f"   Overall Score: {assessment['overall_suspicion_score']:.2f}/100")
-            print(f"   Risk Level: {assessment['risk_level']}")
-            print()
-            print("   Score Components:")
-            components = assessment['score_components']
-            print(f"     - Centrality Score:         {components['centrality_score']:.2f}")
-            print(f"     - Illicit Proximity Score:  {components['illicit_proximity_score']:.2f}")
-            print(f"     - Pattern Involvement Score: {components['pattern_involvement_score']:.2f}")
-            print(f"     - Structural Anomaly Score: {components['structural_anomaly_score']:.2f}")
+        if not skip_detail:
+            print("=" * 80)
+            print("PHASE 3: DETAILED WALLET ANALYSIS")
+            print("=" * 80)
             print()
-            print("   Wallet Features:")
-            features = assessment['wallet_features']
-            print(f"     - In-degree:  {features.get('in_degree', 0)}")
-            print(f"     - Out-degree: {features.get('out_degree', 0)}")
-            print(f"     - Total received: ${features.get('total_received', 0):,.2f}")
-            print(f"     - Total sent:     ${features.get('total_sent', 0):,.2f}")
-            print(f"     - Balance:        ${features.get('balance', 0):,.2f}")
-            print()
-            print("   Illicit Connection:")
-            illicit_conn = assessment['illicit_connection']
-            print(f"     - Is known illicit: {illicit_conn['is_illicit']}")
-            if illicit_conn['distance_to_illicit']:
-                print(f"     - Distance to illicit wallet: {illicit_conn['distance_to_illicit']} hops")
+            
+            # Analyze top 3 wallets in detail
+            print("Detailed Risk Assessments:")
+            print("-" * 40)
+            
+            for i, (wallet, score) in enumerate(top_wallets[:3], 1):
+                assessment = self.suspicion_scorer.get_wallet_risk_assessment(wallet)
+            
+                print(f"\n{i}. Wallet: {wallet}")
+                print(f"   Overall Score: {assessment['overall_suspicion_score']:.2f}/100")
+                print(f"   Risk Level: {assessment['risk_level']}")
+                print()
+                print("   Score Components:")
+                components = assessment['score_components']
+                print(f"     - Centrality Score:         {components['centrality_score']:.2f}")
+                print(f"     - Illicit Proximity Score:  {components['illicit_proximity_score']:.2f}")
+                print(f"     - Pattern Involvement Score: {components['pattern_involvement_score']:.2f}")
+                print(f"     - Structural Anomaly Score: {components['structural_anomaly_score']:.2f}")
+                print()
+                print("   Wallet Features:")
+                features = assessment['wallet_features']
+                print(f"     - In-degree:  {features.get('in_degree', 0)}")
+                print(f"     - Out-degree: {features.get('out_degree', 0)}")
+                print(f"     - Total received: ${features.get('total_received', 0):,.2f}")
+                print(f"     - Total sent:     ${features.get('total_sent', 0):,.2f}")
+                print(f"     - Balance:        ${features.get('balance', 0):,.2f}")
+                print()
+                print("   Illicit Connection:")
+                illicit_conn = assessment['illicit_connection']
+                print(f"     - Is known illicit: {illicit_conn['is_illicit']}")
+                if illicit_conn['distance_to_illicit']:
+                    print(f"     - Distance to illicit wallet: {illicit_conn['distance_to_illicit']} hops")
+                print()
+                print(f"   Patterns Involved: {assessment['patterns_involved']}")
+                if assessment['pattern_types']:
+                    print(f"   Pattern Types: {', '.join(set(assessment['pattern_types']))}")
+                print()
+        
+        if not skip_viz:
+            print("=" * 80)
+            print("PHASE 4: VISUALIZATION")
+            print("=" * 80)
             print()
-            print(f"   Patterns Involved: {assessment['patterns_involved']}")
-            if assessment['pattern_types']:
-                print(f"   Pattern Types: {', '.join(set(assessment['pattern_types']))}")
+            
+            # Create visualizations (imported here so plotting libraries are only
+            # loaded when needed)
+            from ..utils.visualizer import GraphVisualizer
+            self.visualizer = GraphVisualizer(self.blockchain, self.pattern_detector, 
+                                             self.suspicion_scorer)
+            
+            viz_dir = os.path.join(output_dir, "visualizations")
+            self.visualizer.create_dashboard(viz_dir)
             print()
         
-        print("=" * 80)
-        print("PHASE 4: VISUALIZATION")
-        print("=" * 80)
-        print()
-        
-        # Create visualizations
-        self.visualizer = GraphVisualizer(self.blockchain, self.pattern_detector, 
-                                         self.suspicion_scorer)
-        
-        viz_dir = os.path.join(output_dir, "visualizations")
-        self.visualizer.create_dashboard(viz_dir)
-        print()
-        
         print("=" * 80)
         print("ANALYSIS COMPLETE")
         print("=" * 80)
@@ -167,8 +175,9 @@ class SmurfingHunter:
         print()
         print("Output Files:")
         print(f"  - Risk Report: {report_file}")
-        print(f"  - Interactive Graph: {viz_dir}/full_graph.html")
-        print(f"  - Visualizations: {viz_dir}/")
+        if not skip_viz:
+            print(f"  - Interactive Graph: {viz_dir}/full_graph.html")
+            print(f"  - Visualizations: {viz_dir}/")
         print()
         
     def investigate_wallet(self, wallet_id: str):
@@ -199,6 +208,7 @@ class SmurfingHunter:
         
         # Create visualization
         if not self.visualizer:
+            from ..utils.visualizer import GraphVisualizer
             self.visualizer = GraphVisualizer(self.blockchain, self.pattern_detector, 
                                             self.suspicion_scorer)
         
@@ -239,9 +249,33 @@ def main():
         type=str,
         help='Investigate a specific wallet ID'
     )
+    parser.add_argument(
+        '--deep',
+        action='store_true',
+        help='Enumerate every cycle instead of one per strongly connected component (slow)'
+    )
+    parser.add_argument(
+        '--top-n',
+        type=int,
+        default=10,
+        help='Number of most suspicious wallets to list'
+    )
+    parser.add_argument(
+        '--no-detail',
+        action='store_true',
+        help='Skip the detailed assessments of the top wallets'
+    )
+    parser.add_argument(
+        '--no-viz',
+        action='store_true',
+        help='Skip creating visualizations'
+    )
     
     args = parser.parse_args()
     
+    # Progress messages from the analysis modules go through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     # Generate sample data if requested
     if args.generate_data:
         print("Generating sample data...")
@@ -270,7 +304,8 @@ def main():
     if args.investigate:
         hunter.investigate_wallet(args.investigate)
     else:
-        hunter.run_analysis(args.output)
+        hunter.run_analysis(args.output, deep=args.deep, top_n=args.top_n,
+                            skip_detail=args.no_detail, skip_viz=args.no_viz)
 
 
 if __name__ == "__main__":
@@ -4,10 +4,20 @@ Calculates suspicion scores for wallets based on centrality, connections to illi
 and participation in detected patterns
 """
 
+import logging
 import networkx as nx
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple
-from scipy import stats
+from scipy.sparse import csgraph, csr_matrix, diags
+
+from ..utils._kernels import NUMBA_AVAILABLE, max_abs_zscores, pagerank, sampled_betweenness
+
+logger = logging.getLogger(__name__)
+
+# Lower score bounds of the LOW, MEDIUM, HIGH and CRITICAL risk levels
+_RISK_THRESHOLDS = np.array([20, 40, 60, 80], dtype=np.float32)
+_RISK_LABELS = np.array(['MINIMAL', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
 
 
 class SuspicionScorer:
@@ -21,18 +31,53 @@ class SuspicionScorer:
         self.pattern_detector = pattern_detector
         self.wallet_scores = {}
         
+        # Per-wallet component scores from the last calculate_all_scores() run
+        self._centrality_scores = None
+        self._illicit_proximity_scores = None
+        self._pattern_involvement_scores = None
+        self._structural_anomaly_scores = None
+        
+    def _build_csr(self) -> None:
+        """
+        Share the blockchain's CSR arrays across the scoring passes
+        
+        Wallet i is self._node_ids[i]; _adjacency and _reverse_adjacency are
+        unweighted float32 sparse matrices of the graph and its reverse, built
+        straight from the forward and reverse CSR arrays.
+        """
+        blockchain = self.blockchain
+        self._node_ids = np.array(blockchain.wallets, dtype=object)
+        self._node_to_idx = blockchain.wallet_index
+        self._indptr = blockchain.indptr
+        self._indices = blockchain.indices
+        self._illicit_mask = blockchain.illicit_mask
+        
+        n_wallets = len(self._node_ids)
+        self._adjacency = csr_matrix(
+            (np.ones(self._indices.size, dtype=np.float32), self._indices, self._indptr),
+            shape=(n_wallets, n_wallets))
+        self._reverse_adjacency = csr_matrix(
+            (np.ones(blockchain.pred_indices.size, dtype=np.float32), blockchain.pred_indices,
+             blockchain.pred_indptr),
+            shape=(n_wallets, n_wallets))
+    
     def calculate_all_scores(self) -> Dict[str, float]:
         """
         Calculate comprehensive suspicion scores for all wallets
         Combines multiple metrics: centrality, illicit connections, pattern involvement
         """
-        print("Calculating suspicion scores...")
+        logger.info("Calculating suspicion scores...")
+        
+        self._build_csr()
         
-        # Calculate individual components
-        centrality_scores = self._calculate_centrality_scores()
-        illicit_proximity_scores = self._calculate_illicit_proximity_scores()
-        pattern_involvement_scores = self._calculate_pattern_involvement_scores()
-        structural_anomaly_scores = self._calculate_structural_anomaly_scores()
+        # Calculate individual components, kept for the per-wallet assessments
+        centrality_scores = self._centrality_scores = self._calculate_centrality_scores()
+        illicit_proximity_scores = self._illicit_proximity_scores = \
+            self._calculate_illicit_proximity_scores()
+        pattern_involvement_scores = self._pattern_involvement_scores = \
+            self._calculate_pattern_involvement_scores()
+        structural_anomaly_scores = self._structural_anomaly_scores = \
+            self._calculate_structural_anomaly_scores()
         
         # Combine scores with weights
         weights = {
@@ -42,164 +87,135 @@ class SuspicionScorer:
             'structural_anomaly': 0.10
         }
         
-        for wallet in self.graph.nodes():
-            combined_score = (
-                weights['centrality'] * centrality_scores.get(wallet, 0) +
-                weights['illicit_proximity'] * illicit_proximity_scores.get(wallet, 0) +
-                weights['pattern_involvement'] * pattern_involvement_scores.get(wallet, 0) +
-                weights['structural_anomaly'] * structural_anomaly_scores.get(wallet, 0)
-            )
-            
-            self.wallet_scores[wallet] = combined_score
+        # All component arrays are aligned with self._node_ids
+        self._score_array = (
+            weights['centrality'] * centrality_scores +
+            weights['illicit_proximity'] * illicit_proximity_scores +
+            weights['pattern_involvement'] * pattern_involvement_scores +
+            weights['structural_anomaly'] * structural_anomaly_scores
+        ).astype(np.float32)
+        
+        self.wallet_scores = dict(zip(self._node_ids, self._score_array.tolist()))
         
-        print(f"Calculated scores for {len(self.wallet_scores)} wallets")
+        logger.info("Calculated scores for %d wallets", len(self.wallet_scores))
         return self.wallet_scores
     
-    def _calculate_centrality_scores(self) -> Dict[str, float]:
+    def _calculate_centrality_scores(self) -> np.ndarray:
         """
         Calculate scores based on various centrality measures
         High centrality = more connections = potentially more suspicious
         """
-        scores = {}
-        
-        # PageRank - measures importance in the network
-        pagerank = nx.pagerank(self.graph, alpha=0.85)
-        
-        # Betweenness centrality - measures how often a node appears on shortest paths
-        # (may indicate money laundering intermediary)
-        try:
-            betweenness = nx.betweenness_centrality(self.graph, k=min(100, len(self.graph.nodes())))
-        except:
-            betweenness = {node: 0 for node in self.graph.nodes()}
+        n_wallets = len(self._node_ids)
+        
+        # The SciPy closeness BFS runs in a thread while the Numba kernels run
+        # here one after the other; two parallel Numba regions at once abort
+        # the process under the workqueue threading layer
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Closeness centrality - measures how close a node is to all others
+            closeness_future = executor.submit(_closeness, self._reverse_adjacency)
+            
+            # PageRank - measures importance in the network
+            pagerank = _pagerank(self._adjacency, self._reverse_adjacency, alpha=0.85)
+            
+            # Betweenness centrality - measures how often a node appears on shortest paths
+            # (may indicate money laundering intermediary)
+            try:
+                betweenness = _sampled_betweenness(self._indptr, self._indices,
+                                                   k=min(100, n_wallets))
+            except:
+                betweenness = np.zeros(n_wallets)
         
-        # Closeness centrality - measures how close a node is to all others
         try:
-            closeness = nx.closeness_centrality(self.graph)
+            closeness = closeness_future.result()
         except:
-            closeness = {node: 0 for node in self.graph.nodes()}
+            closeness = np.zeros(n_wallets)
         
         # Normalize and combine
-        pr_values = list(pagerank.values())
-        bt_values = list(betweenness.values())
-        cl_values = list(closeness.values())
-        
-        pr_norm = self._normalize_scores(pr_values)
-        bt_norm = self._normalize_scores(bt_values)
-        cl_norm = self._normalize_scores(cl_values)
+        pr_norm = self._normalize_scores(pagerank)
+        bt_norm = self._normalize_scores(betweenness)
+        cl_norm = self._normalize_scores(closeness)
         
-        for i, wallet in enumerate(pagerank.keys()):
-            # Combine centrality measures
-            scores[wallet] = (0.4 * pr_norm[i] + 0.4 * bt_norm[i] + 0.2 * cl_norm[i]) * 100
-        
-        return scores
+        # Combine centrality measures
+        return ((0.4 * pr_norm + 0.4 * bt_norm + 0.2 * cl_norm) * 100).astype(np.float32)
     
-    def _calculate_illicit_proximity_scores(self) -> Dict[str, float]:
+    def _calculate_illicit_proximity_scores(self) -> np.ndarray:
         """
         Calculate scores based on proximity to known illicit wallets
         Closer to illicit nodes = higher score
         """
-        scores = {}
+        # Hop distance to the nearest illicit wallet, from one multi-source BFS
+        # (0 for illicit wallets, -1 when none is reachable)
+        hops, _ = self.blockchain.get_illicit_distances()
         
-        for wallet in self.graph.nodes():
-            # Direct check: is this wallet illicit?
-            if wallet in self.blockchain.illicit_wallets:
-                scores[wallet] = 100.0
-                continue
-            
-            # Calculate shortest path to any illicit wallet
-            path, distance = self.pattern_detector.find_shortest_path_to_illicit(wallet)
-            
-            if distance == float('inf'):
-                # No connection to illicit wallets
-                scores[wallet] = 0.0
-            else:
-                # Score decreases exponentially with distance
-                # Distance 1 = 90, Distance 2 = 70, Distance 3 = 50, etc.
-                scores[wallet] = 100 * np.exp(-0.3 * (distance - 1))
-            
-            # Bonus: count direct connections to illicit wallets
-            illicit_neighbors = sum(
-                1 for neighbor in self.blockchain.get_neighbors(wallet)
-                if neighbor in self.blockchain.illicit_wallets
-            )
-            
-            if illicit_neighbors > 0:
-                scores[wallet] = min(scores[wallet] + illicit_neighbors * 10, 100.0)
+        # Score decreases exponentially with distance
+        # Distance 1 = 90, Distance 2 = 70, Distance 3 = 50, etc.
+        # (the path to an illicit wallet has hops + 1 wallets, hence exp(-0.3 * hops))
+        scores = np.where(hops > 0, 100 * np.exp(np.float32(-0.3) * hops.astype(np.float32)),
+                          np.float32(0))
+        
+        # Bonus: count direct connections to illicit wallets, in or out
+        neighbors = self._adjacency + self._reverse_adjacency
+        neighbors.data = np.ones_like(neighbors.data)
+        illicit_neighbors = neighbors @ self._illicit_mask.astype(np.float32)
+        scores = np.minimum(scores + illicit_neighbors * 10, np.float32(100))
+        
+        # Direct check: illicit wallets get the full score
+        scores[self._illicit_mask] = 100.0
         
         return scores
     
-    def _calculate_pattern_involvement_scores(self) -> Dict[str, float]:
+    def _calculate_pattern_involvement_scores(self) -> np.ndarray:
         """
         Calculate scores based on involvement in detected laundering patterns
         """
-        scores = {wallet: 0.0 for wallet in self.graph.nodes()}
+        wallet_index = self._node_to_idx
+        members, weights = [], []
         
-        # Check each detected pattern
+        # All wallets involved in a pattern get score based on pattern suspicion,
+        # weighted by role; collected flat and summed per wallet in one bincount
         for pattern in self.pattern_detector.detected_patterns:
-            # All wallets involved in the pattern get score based on pattern suspicion
-            involved_wallets = (pattern.source_wallets | pattern.intermediate_wallets | 
-                              pattern.destination_wallets)
-            
-            for wallet in involved_wallets:
-                if wallet in scores:
-                    # Add pattern's suspicion score (weighted by role)
-                    if wallet in pattern.source_wallets or wallet in pattern.destination_wallets:
-                        # Sources and destinations get higher score
-                        scores[wallet] += pattern.suspicion_score * 1.0
-                    else:
-                        # Intermediates get medium score
-                        scores[wallet] += pattern.suspicion_score * 0.7
+            # Sources and destinations get higher score, intermediates medium
+            endpoints = pattern.source_wallets | pattern.destination_wallets
+            intermediates = pattern.intermediate_wallets - endpoints
+            members.extend(endpoints)
+            members.extend(intermediates)
+            weights.extend([pattern.suspicion_score * 1.0] * len(endpoints))
+            weights.extend([pattern.suspicion_score * 0.7] * len(intermediates))
+        
+        ids = np.fromiter((wallet_index.get(w, -1) for w in members), dtype=np.int64,
+                          count=len(members))
+        weights = np.asarray(weights, dtype=np.float64)
+        in_graph = ids >= 0
+        scores = np.bincount(ids[in_graph], weights=weights[in_graph],
+                             minlength=len(self._node_ids)).astype(np.float32)
         
         # Normalize to 0-100 range
-        if scores:
-            max_score = max(scores.values())
-            if max_score > 0:
-                scores = {w: min((s / max_score) * 100, 100) for w, s in scores.items()}
+        if scores.size and scores.max() > 0:
+            scores = np.minimum((scores / scores.max()) * 100, np.float32(100))
         
         return scores
     
-    def _calculate_structural_anomaly_scores(self) -> Dict[str, float]:
+    def _calculate_structural_anomaly_scores(self) -> np.ndarray:
         """
         Calculate scores based on structural anomalies
         (unusual fan-out/fan-in ratios, rapid transactions, etc.)
         """
-        scores = {}
-        
-        # Get all wallet features
-        all_features = []
-        wallet_list = []
-        
-        for wallet in self.graph.nodes():
-            features = self.blockchain.get_wallet_features(wallet)
-            if features:
-                all_features.append([
-                    features['in_degree'],
-                    features['out_degree'],
-                    features['fanout_ratio'],
-                    features['fanin_ratio'],
-                    features['transaction_count']
-                ])
-                wallet_list.append(wallet)
-        
-        if not all_features:
-            return {wallet: 0.0 for wallet in self.graph.nodes()}
-        
-        all_features = np.array(all_features)
-        
-        # Calculate z-scores for each feature (how many std devs from mean)
-        anomaly_scores = []
-        for i in range(all_features.shape[1]):
-            feature_values = all_features[:, i]
-            if np.std(feature_values) > 0:
-                z_scores = np.abs(stats.zscore(feature_values, nan_policy='omit'))
-            else:
-                z_scores = np.zeros_like(feature_values)
-            anomaly_scores.append(z_scores)
-        
-        anomaly_scores = np.array(anomaly_scores)
-        
-        # Combined anomaly score (max z-score across features)
-        combined_anomalies = np.max(anomaly_scores, axis=0)
+        # Features of all wallets, one row per CSR wallet index
+        all_features = self.blockchain.get_all_wallet_features_array()
+        
+        if not len(all_features):
+            return np.zeros(0, dtype=np.float32)
+        
+        # Combined anomaly score (max absolute z-score across features).
+        # Columns with zero standard deviation contribute 0
+        if NUMBA_AVAILABLE:
+            combined_anomalies = max_abs_zscores(all_features)
+        else:
+            mean = all_features.mean(axis=0, dtype=np.float64)
+            std = all_features.std(axis=0, dtype=np.float64)
+            zscores = np.abs((all_features - mean) / np.where(std > 0, std, 1.0))
+            zscores[:, std == 0] = 0
+            combined_anomalies = zscores.max(axis=1).astype(all_features.dtype)
         
         # Normalize to 0-100
         if np.max(combined_anomalies) > 0:
@@ -207,14 +223,7 @@ class SuspicionScorer:
         else:
             normalized = combined_anomalies
         
-        scores = {wallet: float(score) for wallet, score in zip(wallet_list, normalized)}
-        
-        # Fill in any missing wallets
-        for wallet in self.graph.nodes():
-            if wallet not in scores:
-                scores[wallet] = 0.0
-        
-        return scores
+        return normalized
     
     def get_top_suspicious_wallets(self, n: int = 10) -> List[Tuple[str, float]]:
         """
@@ -223,24 +232,39 @@ class SuspicionScorer:
         if not self.wallet_scores:
             self.calculate_all_scores()
         
-        sorted_wallets = sorted(self.wallet_scores.items(), key=lambda x: x[1], reverse=True)
-        return sorted_wallets[:n]
+        scores = self._score_array
+        if n <= 0:
+            return []
+        
+        # Partial selection of the n highest scores, then sort only those;
+        # ties keep graph order, as with a stable sort
+        if n < scores.size:
+            cutoff = np.partition(scores, scores.size - n)[scores.size - n]
+            above = np.flatnonzero(scores > cutoff)
+            tied = np.flatnonzero(scores == cutoff)[:n - above.size]
+            top = np.concatenate([above, tied])
+        else:
+            top = np.arange(scores.size)
+        top = top[np.lexsort((top, -scores[top]))]
+        
+        return [(self._node_ids[i], float(scores[i])) for i in top]
     
     def get_wallet_risk_assessment(self, wallet: str) -> Dict:
         """
         Get detailed risk assessment for a specific wallet
         """
-        if wallet not in self.graph.nodes():
+        if wallet not in self.blockchain.wallet_index:
             return {'error': 'Wallet not found'}
         
-        if not self.wallet_scores:
+        if self._centrality_scores is None:
             self.calculate_all_scores()
         
         # Get component scores
-        centrality = self._calculate_centrality_scores().get(wallet, 0)
-        illicit_proximity = self._calculate_illicit_proximity_scores().get(wallet, 0)
-        pattern_involvement = self._calculate_pattern_involvement_scores().get(wallet, 0)
-        structural_anomaly = self._calculate_structural_anomaly_scores().get(wallet, 0)
+        i = self._node_to_idx[wallet]
+        centrality = float(self._centrality_scores[i])
+        illicit_proximity = float(self._illicit_proximity_scores[i])
+        pattern_involvement = float(self._pattern_involvement_scores[i])
+        structural_anomaly = float(self._structural_anomaly_scores[i])
         
         # Get wallet features
         features = self.blockchain.get_wallet_features(wallet)
@@ -248,7 +272,7 @@ class SuspicionScorer:
         # Find patterns involving this wallet
         involved_patterns = [
             p for p in self.pattern_detector.detected_patterns
-            if wallet in (p.source_wallets | p.intermediate_wallets | p.destination_wallets)
+            if wallet in p.all_wallets
         ]
         
         # Distance to illicit
@@ -266,7 +290,7 @@ class SuspicionScorer:
             },
             'wallet_features': features,
             'illicit_connection': {
-                'is_illicit': wallet in self.blockchain.illicit_wallets,
+                'is_illicit': bool(self._illicit_mask[i]),
                 'distance_to_illicit': distance if distance != float('inf') else None,
                 'path_to_illicit': path if path else None
             },
@@ -276,35 +300,27 @@ class SuspicionScorer:
         
         return assessment
     
-    def _normalize_scores(self, scores: List[float]) -> List[float]:
+    def _normalize_scores(self, scores: np.ndarray) -> np.ndarray:
         """
         Normalize scores to 0-1 range
         """
-        if not scores:
-            return []
+        scores = np.asarray(scores, dtype=np.float64)
+        if not scores.size:
+            return scores
         
-        min_score = min(scores)
-        max_score = max(scores)
+        min_score = scores.min()
+        max_score = scores.max()
         
         if max_score - min_score == 0:
-            return [0.5] * len(scores)
+            return np.full(scores.size, 0.5)
         
-        return [(s - min_score) / (max_score - min_score) for s in scores]
+        return (scores - min_score) / (max_score - min_score)
     
     def _get_risk_level(self, score: float) -> str:
         """
         Convert numerical score to risk level
         """
-        if score >= 80:
-            return "CRITICAL"
-        elif score >= 60:
-            return "HIGH"
-        elif score >= 40:
-            return "MEDIUM"
-        elif score >= 20:
-            return "LOW"
-        else:
-            return "MINIMAL"
+        return str(_RISK_LABELS[np.searchsorted(_RISK_THRESHOLDS, score, side='right')])
     
     def generate_risk_report(self, output_file: str = "risk_report.txt"):
         """
@@ -315,48 +331,138 @@ class SuspicionScorer:
         
         top_wallets = self.get_top_suspicious_wallets(20)
         
-        with open(output_file, 'w') as f:
-            f.write("=" * 80 + "\n")
-            f.write("BLOCKCHAIN MONEY LAUNDERING RISK ASSESSMENT REPORT\n")
-            f.write("=" * 80 + "\n\n")
-            
-            f.write(f"Total wallets analyzed: {len(self.wallet_scores)}\n")
-            f.write(f"Known illicit wallets: {len(self.blockchain.illicit_wallets)}\n")
-            f.write(f"Detected patterns: {len(self.pattern_detector.detected_patterns)}\n\n")
+        # The report is assembled in memory and written in one go
+        lines = []
+        lines.append("=" * 80 + "\n")
+        lines.append("BLOCKCHAIN MONEY LAUNDERING RISK ASSESSMENT REPORT\n")
+        lines.append("=" * 80 + "\n\n")
+        
+        lines.append(f"Total wallets analyzed: {len(self.wallet_scores)}\n")
+        lines.append(f"Known illicit wallets: {len(self.blockchain.illicit_wallets)}\n")
+        lines.append(f"Detected patterns: {len(self.pattern_detector.detected_patterns)}\n\n")
+        
+        # Risk distribution, from CRITICAL down to MINIMAL
+        counts = np.bincount(np.digitize(self._score_array, _RISK_THRESHOLDS),
+                             minlength=len(_RISK_LABELS))
+        risk_levels = dict(zip(_RISK_LABELS[::-1].tolist(), counts[::-1].tolist()))
+        
+        lines.append("Risk Level Distribution:\n")
+        for level, count in risk_levels.items():
+            lines.append(f"  {level}: {count} wallets\n")
+        lines.append("\n")
+        
+        lines.append("=" * 80 + "\n")
+        lines.append("TOP 20 MOST SUSPICIOUS WALLETS\n")
+        lines.append("=" * 80 + "\n\n")
+        
+        for i, (wallet, score) in enumerate(top_wallets, 1):
+            assessment = self.get_wallet_risk_assessment(wallet)
             
-            # Risk distribution
-            risk_levels = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0, 'MINIMAL': 0}
-            for score in self.wallet_scores.values():
-                risk_levels[self._get_risk_level(score)] += 1
+            lines.append(f"{i}. Wallet: {wallet}\n")
+            lines.append(f"   Overall Suspicion Score: {score:.2f}/100\n")
+            lines.append(f"   Risk Level: {assessment['risk_level']}\n")
+            lines.append(f"   Is Known Illicit: {assessment['illicit_connection']['is_illicit']}\n")
             
-            f.write("Risk Level Distribution:\n")
-            for level, count in risk_levels.items():
-                f.write(f"  {level}: {count} wallets\n")
-            f.write("\n")
+            if assessment['illicit_connection']['distance_to_illicit']:
+                lines.append(f"   Distance to Illicit Wallet: {assessment['illicit_connection']['distance_to_illicit']} hops\n")
             
-            f.write("=" * 80 + "\n")
-            f.write("TOP 20 MOST SUSPICIOUS WALLETS\n")
-            f.write("=" * 80 + "\n\n")
+            lines.append(f"   Patterns Involved: {assessment['patterns_involved']}\n")
             
-            for i, (wallet, score) in enumerate(top_wallets, 1):
-                assessment = self.get_wallet_risk_assessment(wallet)
-                
-                f.write(f"{i}. Wallet: {wallet}\n")
-                f.write(f"   Overall Suspicion Score: {score:.2f}/100\n")
-                f.write(f"   Risk Level: {assessment['risk_level']}\n")
-                f.write(f"   Is Known Illicit: {assessment['illicit_connection']['is_illicit']}\n")
-                
-                if assessment['illicit_connection']['distance_to_illicit']:
-                    f.write(f"   Distance to Illicit Wallet: {assessment['illicit_connection']['distance_to_illicit']} hops\n")
-                
-                f.write(f"   Patterns Involved: {assessment['patterns_involved']}\n")
-                
-                components = assessment['score_components']
-                f.write(f"   Score Components:\n")
-                f.write(f"     - Centrality: {components['centrality_score']:.2f}\n")
-                f.write(f"     - Illicit Proximity: {components['illicit_proximity_score']:.2f}\n")
-                f.write(f"     - Pattern Involvement: {components['pattern_involvement_score']:.2f}\n")
-                f.write(f"     - Structural Anomaly: {components['structural_anomaly_score']:.2f}\n")
-                f.write("\n")
-        
-        print(f"Risk report saved to {output_file}")
+            components = assessment['score_components']
+            lines.append(f"   Score Components:\n")
+            lines.append(f"     - Centrality: {components['centrality_score']:.2f}\n")
+            lines.append(f"     - Illicit Proximity: {components['illicit_proximity_score']:.2f}\n")
+            lines.append(f"     - Pattern Involvement: {components['pattern_involvement_score']:.2f}\n")
+            lines.append(f"     - Structural Anomaly: {components['structural_anomaly_score']:.2f}\n")
+            lines.append("\n")
+        
+        with open(output_file, 'w') as f:
+            f.write("".join(lines))
+        
+        logger.info("Risk report saved to %s", output_file)
+
+
+def _pagerank(adjacency, reverse, alpha: float = 0.85, max_iter: int = 100,
+              tol: float = 1.0e-6) -> np.ndarray:
+    """
+    PageRank by power iteration on a sparse adjacency matrix
+    
+    Same iteration as nx.pagerank: uniform teleport, and the rank of wallets
+    without outgoing edges is spread uniformly over all wallets. With Numba
+    the iteration runs in a fused kernel over the reverse CSR arrays
+    (reverse is adjacency.T); otherwise as SciPy sparse products.
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    
+    if NUMBA_AVAILABLE:
+        rank, converged = pagerank(reverse.indptr, reverse.indices, np.diff(adjacency.indptr),
+                                   alpha, tol, max_iter)
+        if not converged:
+            raise nx.PowerIterationFailedConvergence(max_iter)
+        return rank
+    
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=out_degree != 0)
+    transition_t = (diags(inv_degree) @ adjacency).T.tocsr()
+    dangling = out_degree == 0
+    
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        last = rank
+        rank = alpha * (transition_t @ rank + rank[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(rank - last).sum() < n * tol:
+            return rank
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def _sampled_betweenness(indptr, indices, k: int) -> np.ndarray:
+    """
+    Betweenness centrality estimated from k random source wallets
+    
+    Brandes' algorithm runs from each sampled source in a compiled kernel over
+    the CSR arrays, in parallel across sources. Normalized like
+    nx.betweenness_centrality with k samples, which is used directly when
+    Numba is not installed.
+    """
+    n = indptr.size - 1
+    if n < 3 or k == 0:
+        return np.zeros(n)
+    
+    if not NUMBA_AVAILABLE:
+        adjacency = csr_matrix((np.ones(indices.size), indices, indptr), shape=(n, n))
+        graph = nx.from_scipy_sparse_array(adjacency, create_using=nx.DiGraph)
+        betweenness = nx.betweenness_centrality(graph, k=k, seed=np.random.randint(2**31))
+        return np.fromiter((betweenness[i] for i in range(n)), dtype=float, count=n)
+    
+    sources = np.random.choice(n, k, replace=False)
+    betweenness = sampled_betweenness(sources, indptr, indices)
+    
+    # Rescale to the fraction of (s, t) pairs, excluding endpoints
+    scale = np.full(n, 1.0 / (k * (n - 2)))
+    scale[sources] = 1.0 / ((k - 1) * (n - 2)) if k > 1 else np.nan
+    return betweenness * scale
+
+
+def _closeness(reverse, batch_size: int = 256) -> np.ndarray:
+    """
+    Closeness centrality of every wallet from incoming shortest paths
+    
+    Matches nx.closeness_centrality with wf_improved=True: BFS distances over
+    the reversed graph, computed in batches of wallets to bound memory.
+    """
+    n = reverse.shape[0]
+    closeness = np.zeros(n)
+    if n < 2:
+        return closeness
+    
+    for start in range(0, n, batch_size):
+        wallets = np.arange(start, min(start + batch_size, n))
+        distances = csgraph.shortest_path(reverse, unweighted=True, indices=wallets)
+        reachable = np.isfinite(distances)
+        n_reached = reachable.sum(axis=1) - 1
+        total = np.where(reachable, distances, 0.0).sum(axis=1)
+        closeness[wallets] = np.divide(n_reached * n_reached, total * (n - 1),
+                                       out=np.zeros(wallets.size), where=total > 0)
+    return closeness
@@ -3,11 +3,86 @@ Sample Data Generator
 Generates realistic blockchain transaction data with laundering patterns
 """
 
+import csv
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
-import string
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import chain
+from typing import List, Optional, Union
+
+from ..utils._kernels import NUMBA_AVAILABLE, peel_trajectory
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # PyArrow is optional; fall back to pandas' CSV writer
+    pa = None
+
+
+# Fixed reference time that all generated timestamps are offset from, so datasets are reproducible
+BASE_TIME = pd.Timestamp('2024-01-01')
+
+TRANSACTION_COLUMNS = ['Source_Wallet_ID', 'Dest_Wallet_ID', 'Timestamp', 'Amount', 'Token_Type']
+
+# Fixed-width record layout used to hand transactions between processes in one buffer
+TRANSACTION_DTYPE = np.dtype([
+    ('Source_Wallet_ID', 'U42'),
+    ('Dest_Wallet_ID', 'U42'),
+    ('Timestamp', 'datetime64[us]'),
+    ('Amount', 'f8'),
+    ('Token_Type', 'U4')
+])
+
+
+def _transaction_frame(sources, dests, timestamps, amounts, tokens) -> pd.DataFrame:
+    """
+    Build a transactions DataFrame from per-column sequences
+    
+    Amounts are rounded to 6 decimals; tokens may be a single symbol for the whole pattern.
+    """
+    return pd.DataFrame({
+        'Source_Wallet_ID': np.asarray(sources),
+        'Dest_Wallet_ID': np.asarray(dests),
+        'Timestamp': pd.to_datetime(timestamps),
+        'Amount': np.round(np.asarray(amounts, dtype=float), 6),
+        'Token_Type': np.broadcast_to(np.asarray(tokens), len(sources))
+    })
+
+
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a DataFrame to CSV, using PyArrow's multithreaded writer when available
+    """
+    if pa is not None:
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+    else:
+        df.to_csv(path, index=False)
+
+
+def _to_records(df: pd.DataFrame) -> np.ndarray:
+    """
+    Pack a transactions DataFrame into a TRANSACTION_DTYPE structured array
+    
+    Records are returned in timestamp order, so each part forms a sorted run.
+    """
+    records = np.empty(len(df), dtype=TRANSACTION_DTYPE)
+    for col in TRANSACTION_COLUMNS:
+        records[col] = df[col].to_numpy()
+    return records[np.argsort(records['Timestamp'], kind='stable')]
+
+
+def _write_rows(writer, df: pd.DataFrame) -> None:
+    """
+    Append a transactions DataFrame to an open csv.writer
+    """
+    writer.writerows(zip(
+        df['Source_Wallet_ID'],
+        df['Dest_Wallet_ID'],
+        df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S.%f'),
+        df['Amount'],
+        df['Token_Type']
+    ))
 
 
 class DataGenerator:
@@ -15,49 +90,52 @@ class DataGenerator:
     Generates synthetic blockchain transaction data with embedded laundering patterns
     """
     
-    def __init__(self, seed: int = 42):
-        random.seed(seed)
-        np.random.seed(seed)
+    def __init__(self, seed: Union[int, np.random.SeedSequence] = 42):
+        self.seed_sequence = (seed if isinstance(seed, np.random.SeedSequence)
+                              else np.random.SeedSequence(seed))
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.base_time = BASE_TIME
         self.wallet_counter = 0
         
     def generate_wallet_id(self) -> str:
         """Generate a realistic-looking wallet ID"""
-        self.wallet_counter += 1
-        prefix = '0x' + ''.join(random.choices(string.hexdigits.lower(), k=40))
-        return prefix
+        return self.generate_wallet_ids(1)[0]
+    
+    def generate_wallet_ids(self, n: int) -> List[str]:
+        """Generate n realistic-looking wallet IDs from a single bulk random draw"""
+        self.wallet_counter += n
+        raw = self.rng.bytes(20 * n)
+        return ['0x' + raw[i * 20:(i + 1) * 20].hex() for i in range(n)]
     
     def generate_normal_transactions(self, n_wallets: int = 100, 
                                     n_transactions: int = 500) -> pd.DataFrame:
         """
         Generate normal (non-suspicious) transactions
         """
-        wallets = [self.generate_wallet_id() for _ in range(n_wallets)]
+        wallets = self.generate_wallet_ids(n_wallets)
+        wallet_array = np.asarray(wallets)
         
-        transactions = []
-        start_time = datetime.now() - timedelta(days=30)
+        start_time = self.base_time - pd.Timedelta(days=30)
         
-        for _ in range(n_transactions):
-            source = random.choice(wallets)
-            dest = random.choice([w for w in wallets if w != source])
-            
-            # Normal transaction amounts follow log-normal distribution
-            amount = np.random.lognormal(mean=3, sigma=1.5)
-            
-            # Random timestamp within last 30 days
-            time_offset = timedelta(seconds=random.randint(0, 30 * 24 * 3600))
-            timestamp = start_time + time_offset
-            
-            token_type = random.choice(['ETH', 'BTC', 'USDT', 'BNB'])
-            
-            transactions.append({
-                'Source_Wallet_ID': source,
-                'Dest_Wallet_ID': dest,
-                'Timestamp': timestamp,
-                'Amount': round(amount, 6),
-                'Token_Type': token_type
-            })
-        
-        return pd.DataFrame(transactions), wallets
+        # Draw all source/destination indices at once. Destinations are drawn from the
+        # n_wallets - 1 other wallets and shifted past the source, so no self-transfers occur
+        src_idx = self.rng.integers(0, n_wallets, n_transactions)
+        dst_idx = self.rng.integers(0, n_wallets - 1, n_transactions)
+        dst_idx += dst_idx >= src_idx
+        
+        # Normal transaction amounts follow log-normal distribution
+        amounts = self.rng.lognormal(mean=3, sigma=1.5, size=n_transactions)
+        
+        # Random timestamps within last 30 days
+        offsets = self.rng.integers(0, 30 * 24 * 3600, n_transactions)
+        timestamps = start_time + pd.to_timedelta(offsets, unit='s')
+        
+        tokens = self.rng.choice(['ETH', 'BTC', 'USDT', 'BNB'], n_transactions)
+        
+        transactions = _transaction_frame(wallet_array[src_idx], wallet_array[dst_idx],
+                                          timestamps, amounts, tokens)
+        
+        return transactions, wallets
     
     def generate_fanout_fanin_pattern(self, n_intermediates: int = 10) -> pd.DataFrame:
         """
@@ -65,48 +143,35 @@ class DataGenerator:
         Source -> Multiple Intermediates -> Destination
         """
         source = self.generate_wallet_id()
-        intermediates = [self.generate_wallet_id() for _ in range(n_intermediates)]
+        intermediates = self.generate_wallet_ids(n_intermediates)
         destination = self.generate_wallet_id()
         
-        transactions = []
-        start_time = datetime.now() - timedelta(days=15)
+        start_time = self.base_time - pd.Timedelta(days=15)
         
         # Large initial amount
-        total_amount = random.uniform(10000, 50000)
+        total_amount = self.rng.uniform(10000, 50000)
         
-        # Phase 1: Fan-out (Source -> Intermediates)
-        for i, intermediate in enumerate(intermediates):
-            # Split amount with some variation
-            amount = total_amount / n_intermediates * random.uniform(0.8, 1.2)
-            timestamp = start_time + timedelta(minutes=i * 5)
-            
-            transactions.append({
-                'Source_Wallet_ID': source,
-                'Dest_Wallet_ID': intermediate,
-                'Timestamp': timestamp,
-                'Amount': round(amount, 6),
-                'Token_Type': 'ETH'
-            })
+        # Phase 1: Fan-out (Source -> Intermediates), one transfer every 5 minutes.
+        # Split amount with some variation
+        per_intermediate = total_amount / n_intermediates
+        fanout_amounts = per_intermediate * self.rng.uniform(0.8, 1.2, n_intermediates)
+        fanout_times = start_time + pd.to_timedelta(np.arange(n_intermediates) * 5, unit='m')
         
         # Phase 2: Delay and intermediate hops (optional)
-        delay = timedelta(hours=random.randint(1, 24))
+        delay = pd.Timedelta(hours=int(self.rng.integers(1, 25)))
         
         # Phase 3: Fan-in (Intermediates -> Destination)
-        for i, intermediate in enumerate(intermediates):
-            # Slightly reduce amount (to simulate fees)
-            original_amount = total_amount / n_intermediates * random.uniform(0.8, 1.2)
-            amount = original_amount * random.uniform(0.95, 0.99)
-            timestamp = start_time + delay + timedelta(minutes=i * 5)
-            
-            transactions.append({
-                'Source_Wallet_ID': intermediate,
-                'Dest_Wallet_ID': destination,
-                'Timestamp': timestamp,
-                'Amount': round(amount, 6),
-                'Token_Type': 'ETH'
-            })
-        
-        return pd.DataFrame(transactions), [source], intermediates, [destination]
+        # Each intermediate forwards what it received, slightly reduced (to simulate fees)
+        fanin_amounts = fanout_amounts * self.rng.uniform(0.95, 0.99, n_intermediates)
+        fanin_times = fanout_times + delay
+        
+        sources = [source] * n_intermediates + intermediates
+        dests = intermediates + [destination] * n_intermediates
+        timestamps = fanout_times.append(fanin_times)
+        amounts = np.concatenate((fanout_amounts, fanin_amounts))
+        
+        transactions = _transaction_frame(sources, dests, timestamps, amounts, 'ETH')
+        return transactions, [source], intermediates, [destination]
     
     def generate_layered_pattern(self, n_layers: int = 3, 
                                  wallets_per_layer: int = 5) -> pd.DataFrame:
@@ -115,119 +180,110 @@ class DataGenerator:
         """
         layers = []
         for _ in range(n_layers + 1):
-            layers.append([self.generate_wallet_id() for _ in range(wallets_per_layer)])
+            layers.append(self.generate_wallet_ids(wallets_per_layer))
         
-        transactions = []
-        start_time = datetime.now() - timedelta(days=20)
+        sources, dests, offsets, amounts = [], [], [], []
+        start_time = self.base_time - pd.Timedelta(days=20)
         
-        initial_amount = random.uniform(20000, 100000)
+        initial_amount = self.rng.uniform(20000, 100000)
         
         # Go through each layer
         for layer_idx in range(n_layers):
-            current_layer = layers[layer_idx]
-            next_layer = layers[layer_idx + 1]
+            current_layer = np.asarray(layers[layer_idx])
+            next_layer = np.asarray(layers[layer_idx + 1])
             
-            for i, source_wallet in enumerate(current_layer):
-                # Each wallet sends to multiple wallets in next layer
-                for j, dest_wallet in enumerate(next_layer):
-                    if random.random() < 0.6:  # 60% connection probability
-                        # Amount diminishes slightly at each layer
-                        amount = (initial_amount / (wallets_per_layer ** (layer_idx + 1))) * random.uniform(0.8, 1.2)
-                        
-                        # Add time delay
-                        time_offset = timedelta(hours=layer_idx * 12 + random.randint(0, 360))
-                        timestamp = start_time + time_offset
-                        
-                        transactions.append({
-                            'Source_Wallet_ID': source_wallet,
-                            'Dest_Wallet_ID': dest_wallet,
-                            'Timestamp': timestamp,
-                            'Amount': round(amount, 6),
-                            'Token_Type': 'BTC'
-                        })
-        
-        return pd.DataFrame(transactions), layers[0], sum(layers[1:-1], []), layers[-1]
+            # Each wallet sends to multiple wallets in next layer (60% connection probability)
+            connected = self.rng.random((wallets_per_layer, wallets_per_layer)) < 0.6
+            src_idx, dst_idx = np.nonzero(connected)
+            n_edges = src_idx.size
+            
+            # Amount diminishes slightly at each layer
+            layer_amount = initial_amount / (wallets_per_layer ** (layer_idx + 1))
+            amounts.append(layer_amount * self.rng.uniform(0.8, 1.2, n_edges))
+            
+            # Add time delay (in hours)
+            offsets.append(layer_idx * 12 + self.rng.integers(0, 361, n_edges))
+            
+            sources.append(current_layer[src_idx])
+            dests.append(next_layer[dst_idx])
+        
+        timestamps = start_time + pd.to_timedelta(np.concatenate(offsets), unit='h')
+        sources = np.concatenate(sources)
+        dests = np.concatenate(dests)
+        amounts = np.concatenate(amounts)
+        
+        transactions = _transaction_frame(sources, dests, timestamps, amounts, 'BTC')
+        intermediates = list(chain.from_iterable(layers[1:-1]))
+        return transactions, layers[0], intermediates, layers[-1]
     
     def generate_cyclic_pattern(self, cycle_length: int = 5) -> pd.DataFrame:
         """
         Generate a cyclic laundering pattern where money goes in a loop
         """
-        wallets = [self.generate_wallet_id() for _ in range(cycle_length)]
+        wallets = self.generate_wallet_ids(cycle_length)
         
-        transactions = []
-        start_time = datetime.now() - timedelta(days=10)
+        start_time = self.base_time - pd.Timedelta(days=10)
         
-        amount = random.uniform(5000, 20000)
+        amount = self.rng.uniform(5000, 20000)
         
-        for i in range(cycle_length):
-            source = wallets[i]
-            dest = wallets[(i + 1) % cycle_length]
-            
-            # Slightly reduce amount at each hop (peeling)
-            current_amount = amount * (0.98 ** i)
-            
-            timestamp = start_time + timedelta(hours=i * 6)
-            
-            transactions.append({
-                'Source_Wallet_ID': source,
-                'Dest_Wallet_ID': dest,
-                'Timestamp': timestamp,
-                'Amount': round(current_amount, 6),
-                'Token_Type': 'USDT'
-            })
-        
-        return pd.DataFrame(transactions), wallets
+        hops = np.arange(cycle_length)
+        sources = wallets
+        dests = wallets[1:] + wallets[:1]
+        
+        # Slightly reduce amount at each hop (peeling), one hop every 6 hours
+        amounts = amount * (0.98 ** hops)
+        timestamps = start_time + pd.to_timedelta(hops * 6, unit='h')
+        
+        return _transaction_frame(sources, dests, timestamps, amounts, 'USDT'), wallets
     
     def generate_peeling_chain(self, chain_length: int = 10) -> pd.DataFrame:
         """
         Generate a peeling chain where small amounts are peeled off at each hop
         """
-        wallets = [self.generate_wallet_id() for _ in range(chain_length + 1)]
-        
-        transactions = []
-        start_time = datetime.now() - timedelta(days=5)
-        
-        initial_amount = random.uniform(10000, 30000)
-        remaining = initial_amount
-        
-        for i in range(chain_length):
-            source = wallets[i]
-            dest = wallets[i + 1]
-            
-            # Peel off 0.5-2% to another wallet (simulating gas/small peel)
-            peel_amount = remaining * random.uniform(0.005, 0.020)
-            peel_dest = self.generate_wallet_id()
-            
-            # Main transfer (85-95% of remaining)
-            main_amount = remaining - peel_amount
-            
-            timestamp = start_time + timedelta(minutes=i * 30)
-            
-            # Peeling transaction
-            transactions.append({
-                'Source_Wallet_ID': source,
-                'Dest_Wallet_ID': peel_dest,
-                'Timestamp': timestamp,
-                'Amount': round(peel_amount, 6),
-                'Token_Type': 'ETH'
-            })
-            
-            # Main chain transaction
-            transactions.append({
-                'Source_Wallet_ID': source,
-                'Dest_Wallet_ID': dest,
-                'Timestamp': timestamp + timedelta(seconds=30),
-                'Amount': round(main_amount, 6),
-                'Token_Type': 'ETH'
-            })
-            
-            remaining = main_amount
-        
-        return pd.DataFrame(transactions), wallets
+        wallets = self.generate_wallet_ids(chain_length + 1)
+        peel_wallets = self.generate_wallet_ids(chain_length)
+        
+        start_time = self.base_time - pd.Timedelta(days=5)
+        
+        initial_amount = self.rng.uniform(10000, 30000)
+        
+        # Peel off 0.5-2% to another wallet at each hop (simulating gas/small peel).
+        # The amount entering each hop is the running product of what was kept before it.
+        peel_fracs = self.rng.uniform(0.005, 0.020, chain_length)
+        if NUMBA_AVAILABLE and chain_length > 64:
+            # Long chains: compiled loop avoids the cumprod/temporary arrays
+            main_amounts = peel_trajectory(initial_amount, peel_fracs)
+            remaining = np.concatenate(([initial_amount], main_amounts[:-1]))
+            peel_amounts = remaining - main_amounts
+        else:
+            remaining = initial_amount * np.concatenate(([1.0], np.cumprod(1 - peel_fracs)[:-1]))
+            peel_amounts = remaining * peel_fracs
+            main_amounts = remaining - peel_amounts
+        
+        hop_times = start_time + pd.to_timedelta(np.arange(chain_length) * 30, unit='m')
+        
+        # Peeling transaction, then the main chain transaction 30 seconds later, for each hop
+        chain_wallets = np.asarray(wallets)
+        sources = np.repeat(chain_wallets[:-1], 2)
+        dests = np.column_stack((peel_wallets, chain_wallets[1:])).ravel()
+        timestamps = np.column_stack((hop_times, hop_times + pd.Timedelta(seconds=30))).ravel()
+        amounts = np.column_stack((peel_amounts, main_amounts)).ravel()
+        
+        return _transaction_frame(sources, dests, timestamps, amounts, 'ETH'), wallets
     
-    def generate_complete_dataset(self, output_dir: str = "."):
+    def generate_complete_dataset(self, output_dir: str = ".", max_workers: Optional[int] = None,
+                                  stream: bool = False):
         """
         Generate a complete dataset with normal and suspicious transactions
+        
+        Laundering patterns are independent of each other and each one gets its own
+        child seed, so the output is the same whether they are generated in turn or,
+        with max_workers > 1, in a process pool. Starting the worker processes costs
+        more than generating the default patterns, so the pool is opt-in.
+        
+        With stream=True each pattern is appended to the CSV as soon as its worker finishes,
+        so peak memory stays flat for very large datasets. Streamed rows are grouped by
+        pattern rather than sorted by timestamp.
         """
         print("Generating synthetic blockchain transaction dataset...")
         
@@ -239,58 +295,92 @@ class DataGenerator:
         normal_df, normal_wallets = self.generate_normal_transactions(
             n_wallets=150, n_transactions=800
         )
-        all_transactions.append(normal_df)
         
-        # Generate laundering patterns
-        print("  - Generating fan-out/fan-in patterns...")
+        # Plan laundering patterns: (generator method, keyword arguments)
+        pattern_plan = []
         for _ in range(5):
-            pattern_df, sources, intermediates, dests = self.generate_fanout_fanin_pattern(
-                n_intermediates=random.randint(8, 15)
-            )
-            all_transactions.append(pattern_df)
-            illicit_wallets.extend(sources)
-        
-        print("  - Generating layered patterns...")
+            pattern_plan.append(('generate_fanout_fanin_pattern', {
+                'n_intermediates': int(self.rng.integers(8, 16))
+            }))
         for _ in range(3):
-            pattern_df, sources, intermediates, dests = self.generate_layered_pattern(
-                n_layers=random.randint(2, 4),
-                wallets_per_layer=random.randint(4, 7)
-            )
-            all_transactions.append(pattern_df)
-            illicit_wallets.extend(sources)
-        
-        print("  - Generating cyclic patterns...")
+            pattern_plan.append(('generate_layered_pattern', {
+                'n_layers': int(self.rng.integers(2, 5)),
+                'wallets_per_layer': int(self.rng.integers(4, 8))
+            }))
         for _ in range(4):
-            pattern_df, wallets = self.generate_cyclic_pattern(
-                cycle_length=random.randint(4, 8)
-            )
-            all_transactions.append(pattern_df)
-            illicit_wallets.append(wallets[0])
-        
-        print("  - Generating peeling chains...")
+            pattern_plan.append(('generate_cyclic_pattern', {
+                'cycle_length': int(self.rng.integers(4, 9))
+            }))
         for _ in range(3):
-            pattern_df, wallets = self.generate_peeling_chain(
-                chain_length=random.randint(8, 12)
-            )
-            all_transactions.append(pattern_df)
-            illicit_wallets.append(wallets[0])
-        
-        # Combine all transactions
-        final_df = pd.concat(all_transactions, ignore_index=True)
+            pattern_plan.append(('generate_peeling_chain', {
+                'chain_length': int(self.rng.integers(8, 13))
+            }))
         
-        # Sort by timestamp
-        final_df = final_df.sort_values('Timestamp').reset_index(drop=True)
+        # Generate laundering patterns
+        print("  - Generating fan-out/fan-in, layered, cyclic and peeling chain patterns...")
+        child_seeds = self.seed_sequence.spawn(len(pattern_plan))
+        tasks = [(method, kwargs, child_seed)
+                 for (method, kwargs), child_seed in zip(pattern_plan, child_seeds)]
         
-        # Save transactions
         transactions_file = f"{output_dir}/transactions.csv"
-        final_df.to_csv(transactions_file, index=False)
+        
+        use_pool = max_workers not in (None, 1) and len(tasks) > 1
+        executor = ProcessPoolExecutor(max_workers=max_workers) if use_pool else None
+        with executor or nullcontext():
+            results = (executor.map(_generate_pattern, tasks) if use_pool
+                       else map(_generate_pattern, tasks))
+            
+            if stream:
+                total_transactions = len(normal_df)
+                wallets = set(normal_wallets)
+                with open(transactions_file, 'w', newline='', buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(TRANSACTION_COLUMNS)
+                    _write_rows(writer, pd.DataFrame(_to_records(normal_df)))
+                    
+                    for (method, _), result in zip(pattern_plan, results):
+                        pattern_df = pd.DataFrame(result[0])
+                        _write_rows(writer, pattern_df)
+                        illicit_wallets.extend(_pattern_illicit_wallets(method, result))
+                        total_transactions += len(pattern_df)
+                        wallets.update(pattern_df['Source_Wallet_ID'])
+                        wallets.update(pattern_df['Dest_Wallet_ID'])
+                total_wallets = len(wallets)
+            else:
+                all_transactions.append(_to_records(normal_df))
+                for (method, _), result in zip(pattern_plan, results):
+                    all_transactions.append(result[0])
+                    illicit_wallets.extend(_pattern_illicit_wallets(method, result))
+        
+        if not stream:
+            # Combine all transactions in a single pass over the record buffers
+            final_df = pd.DataFrame(np.concatenate(all_transactions))
+            
+            # Store repeated strings as categoricals; both wallet columns share one category set
+            wallet_dtype = pd.CategoricalDtype(
+                pd.unique(np.concatenate([final_df['Source_Wallet_ID'].to_numpy(),
+                                          final_df['Dest_Wallet_ID'].to_numpy()]))
+            )
+            final_df['Source_Wallet_ID'] = final_df['Source_Wallet_ID'].astype(wallet_dtype)
+            final_df['Dest_Wallet_ID'] = final_df['Dest_Wallet_ID'].astype(wallet_dtype)
+            final_df['Token_Type'] = final_df['Token_Type'].astype('category')
+            
+            # Sort by timestamp. Every part is already a sorted run, so the stable
+            # (timsort) sort only has to merge the runs rather than sort from scratch
+            final_df = final_df.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+            
+            # Save transactions
+            _write_csv(final_df, transactions_file)
+            total_transactions = len(final_df)
+            total_wallets = len(wallet_dtype.categories)
+        
         print(f"\nTransactions saved to {transactions_file}")
-        print(f"  Total transactions: {len(final_df)}")
-        print(f"  Total wallets: {len(set(final_df['Source_Wallet_ID']) | set(final_df['Dest_Wallet_ID']))}")
+        print(f"  Total transactions: {total_transactions}")
+        print(f"  Total wallets: {total_wallets}")
         
         # Save illicit wallets
-        reasons = ['Known hacker', 'Ransomware', 'Dark web marketplace', 'Money laundering']
-        illicit_reasons = [reasons[i % len(reasons)] for i in range(len(illicit_wallets))]
+        reasons = np.array(['Known hacker', 'Ransomware', 'Dark web marketplace', 'Money laundering'])
+        illicit_reasons = reasons[np.arange(len(illicit_wallets)) % reasons.size]
         illicit_df = pd.DataFrame({
             'Wallet_ID': illicit_wallets,
             'Reason': illicit_reasons
@@ -304,6 +394,26 @@ class DataGenerator:
         return transactions_file, illicit_file
 
 
+def _pattern_illicit_wallets(method: str, result) -> List[str]:
+    """
+    Pick the seed wallets to flag as illicit from a pattern generator's result
+    """
+    if method in ('generate_fanout_fanin_pattern', 'generate_layered_pattern'):
+        return list(result[1])
+    # Cyclic and peeling patterns return the full wallet chain
+    return [result[1][0]]
+
+
+def _generate_pattern(task):
+    """
+    Run one pattern generator in a worker process with its own child seed
+    """
+    method, kwargs, seed = task
+    generator = DataGenerator(seed=seed)
+    pattern_df, *wallets = getattr(generator, method)(**kwargs)
+    return (_to_records(pattern_df), *wallets)
+
+
 if __name__ == "__main__":
     generator = DataGenerator(seed=42)
     generator.generate_complete_dataset()
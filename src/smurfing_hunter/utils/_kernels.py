@@ -0,0 +1,389 @@
+"""
+Compiled Kernels
+Numba-JIT'd inner loops shared by the data generator and the analysis modules.
+Numba is listed in requirements.txt. If it is missing the kernels still run as
+plain Python; callers whose kernels would be too slow that way check
+NUMBA_AVAILABLE and use a NumPy or NetworkX fallback instead.
+"""
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def get_num_threads():
+        """Stand-in for numba.get_num_threads: the fallback runs single-threaded"""
+        return 1
+
+    def njit(*args, **kwargs):
+        """Stand-in decorator used when Numba is not installed"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def peel_trajectory(initial_amount, peel_fracs):
+    """
+    Amount forwarded along a peeling chain after each hop
+
+    At hop i a fraction peel_fracs[i] of the incoming amount is peeled off and
+    the rest is forwarded; returns the forwarded amount for every hop.
+    """
+    n = peel_fracs.size
+    forwarded = np.empty(n)
+    remaining = initial_amount
+    for i in range(n):
+        remaining = remaining - remaining * peel_fracs[i]
+        forwarded[i] = remaining
+    return forwarded
+
+
+@njit(cache=True)
+def score_patterns(n_intermediates, illicit_counts, n_wallets, amounts, is_peeling, median_amount):
+    """
+    Suspicion score (0-100) for a batch of patterns
+
+    Combines the number of intermediaries, the share of illicit wallets, the
+    amount relative to the median edge amount and a bonus for long peeling chains.
+    """
+    n = amounts.size
+    scores = np.empty(n)
+    for i in range(n):
+        # Factor 1: Number of intermediaries (more = more suspicious)
+        score = min(n_intermediates[i] / 10.0, 1.0) * 30
+
+        # Factor 2: Connection to illicit wallets
+        if n_wallets[i] > 0:
+            score += min(illicit_counts[i] / n_wallets[i], 1.0) * 40
+
+        # Factor 3: Amount (larger amounts more suspicious)
+        if amounts[i] > 0:
+            score += min(amounts[i] / (median_amount * 10), 1.0) * 30
+
+        # Bonus: Peeling chains are inherently suspicious if long
+        if is_peeling[i] and n_intermediates[i] > 4:
+            score += 15
+
+        scores[i] = min(score, 100.0)
+    return scores
+
+
+@njit(cache=True)
+def walk_peeling_chains(candidates, indptr, indices, edge_amounts, total_sent, threshold, max_hops):
+    """
+    Follow peeling chains from each candidate wallet over a CSR graph
+
+    A chain continues along a wallet's largest outgoing edge while that edge
+    carries at least (1 - threshold) of the wallet's total sent amount. Wallets
+    reached by an earlier chain are not used as new starting points, so the
+    candidates are walked in order. Returns the node IDs of every chain with at
+    least 3 wallets, concatenated, and the offsets delimiting each chain.
+    """
+    visited = np.zeros(indptr.size - 1, dtype=np.bool_)
+    chain = np.empty(max_hops + 1, dtype=np.int64)
+    flat = np.empty(max(16, candidates.size), dtype=np.int64)
+    offsets = np.zeros(candidates.size + 1, dtype=np.int64)
+    n_chains = 0
+    size = 0
+
+    for start in candidates:
+        if visited[start]:
+            continue
+        chain[0] = start
+        length = 1
+        current = start
+
+        while length <= max_hops:
+            first_edge = indptr[current]
+            last_edge = indptr[current + 1]
+            if first_edge == last_edge or total_sent[current] == 0:
+                break
+
+            # The largest transaction is the continuation of the chain, the others are peels
+            best_edge = first_edge
+            for edge in range(first_edge + 1, last_edge):
+                if edge_amounts[edge] > edge_amounts[best_edge]:
+                    best_edge = edge
+            if edge_amounts[best_edge] / total_sent[current] < 1 - threshold:
+                break
+
+            next_wallet = indices[best_edge]
+            seen = False
+            for i in range(length):
+                if chain[i] == next_wallet:
+                    seen = True
+                    break
+            if seen:
+                break
+
+            chain[length] = next_wallet
+            length += 1
+            visited[next_wallet] = True
+            current = next_wallet
+
+        if length >= 3:
+            if size + length > flat.size:
+                grown = np.empty(2 * flat.size + length, dtype=np.int64)
+                grown[:size] = flat[:size]
+                flat = grown
+            flat[size:size + length] = chain[:length]
+            size += length
+            n_chains += 1
+            offsets[n_chains] = size
+
+    return flat[:size], offsets[:n_chains + 1]
+
+
+@njit(cache=True, fastmath=True)
+def max_abs_zscores(features):
+    """
+    Largest absolute z-score of each row across the feature columns
+
+    Columns with zero standard deviation contribute 0. The column statistics
+    are accumulated in float64; the result has the dtype of features.
+    """
+    n_rows, n_cols = features.shape
+    result = np.zeros(n_rows, dtype=features.dtype)
+    for j in range(n_cols):
+        mean = 0.0
+        for i in range(n_rows):
+            mean += features[i, j]
+        mean /= n_rows
+
+        var = 0.0
+        for i in range(n_rows):
+            var += (features[i, j] - mean) ** 2
+        std = np.sqrt(var / n_rows)
+        if std == 0:
+            continue
+
+        for i in range(n_rows):
+            z = abs(features[i, j] - mean) / std
+            if z > result[i]:
+                result[i] = z
+    return result
+
+
+@njit(cache=True, fastmath=True)
+def pagerank(pred_indptr, pred_indices, out_degree, alpha, tol, max_iter):
+    """
+    PageRank by power iteration over the reverse CSR arrays
+
+    Each wallet pulls rank from its predecessors; the rank of wallets without
+    outgoing edges is spread uniformly and the iteration stops once the L1
+    change drops below n * tol. Returns the ranks and whether they converged.
+    Serial on purpose: it runs alongside the parallel betweenness kernel, and
+    Numba's workqueue threading layer aborts on concurrent parallel regions.
+    """
+    n = pred_indptr.size - 1
+    inv_degree = np.zeros(n)
+    for j in range(n):
+        if out_degree[j] > 0:
+            inv_degree[j] = 1.0 / out_degree[j]
+
+    rank = np.full(n, 1.0 / n)
+    new_rank = np.empty(n)
+    share = np.empty(n)
+
+    for _ in range(max_iter):
+        dangling = 0.0
+        for j in range(n):
+            share[j] = rank[j] * inv_degree[j]
+            if out_degree[j] == 0:
+                dangling += rank[j]
+        base = alpha * dangling / n + (1 - alpha) / n
+
+        err = 0.0
+        for i in range(n):
+            pulled = 0.0
+            for edge in range(pred_indptr[i], pred_indptr[i + 1]):
+                pulled += share[pred_indices[edge]]
+            new_rank[i] = alpha * pulled + base
+            err += abs(new_rank[i] - rank[i])
+
+        rank, new_rank = new_rank, rank
+        if err < n * tol:
+            return rank, True
+    return rank, False
+
+
+def count_fanin_destinations(sources, indptr, indices, edge_first_time, edge_last_time, min_fanin):
+    """
+    Number of fan-in destinations two hops downstream of each source
+
+    A destination counts for a source when at least min_fanin of the source's
+    intermediates send to it strictly after first receiving from the source.
+    Sources are split into one block per thread.
+    """
+    n_blocks = max(1, min(get_num_threads(), sources.size))
+    return _count_fanin_blocks(sources, indptr, indices, edge_first_time, edge_last_time,
+                               min_fanin, n_blocks)
+
+
+@njit(cache=True, parallel=True)
+def _count_fanin_blocks(sources, indptr, indices, edge_first_time, edge_last_time, min_fanin,
+                        n_blocks):
+    """
+    Parallel body of count_fanin_destinations
+
+    Each block reuses a dense per-destination counter, resetting only the
+    entries it touched for the previous source.
+    """
+    n_nodes = indptr.size - 1
+    counts = np.zeros(sources.size, dtype=np.int64)
+    block_size = (sources.size + n_blocks - 1) // n_blocks
+
+    for block in prange(n_blocks):
+        counter = np.zeros(n_nodes, dtype=np.int32)
+        touched = np.empty(n_nodes, dtype=np.int32)
+
+        for k in range(block * block_size, min((block + 1) * block_size, sources.size)):
+            source = sources[k]
+            n_touched = 0
+            for edge in range(indptr[source], indptr[source + 1]):
+                intermediate = indices[edge]
+                time_in = edge_first_time[edge]
+                for out_edge in range(indptr[intermediate], indptr[intermediate + 1]):
+                    # Outgoing transaction must happen strictly after incoming
+                    if edge_last_time[out_edge] > time_in:
+                        dest = indices[out_edge]
+                        if counter[dest] == 0:
+                            touched[n_touched] = dest
+                            n_touched += 1
+                        counter[dest] += 1
+                        if counter[dest] == min_fanin:
+                            counts[k] += 1
+
+            for i in range(n_touched):
+                counter[touched[i]] = 0
+    return counts
+
+
+def sampled_betweenness(sources, indptr, indices):
+    """
+    Unnormalized betweenness accumulated from the given BFS sources
+
+    Brandes' algorithm over a CSR graph: one BFS per source counts shortest
+    paths, then dependencies are accumulated in reverse BFS order. Sources
+    are split into one block per thread.
+    """
+    n_blocks = max(1, min(get_num_threads(), sources.size))
+    return _betweenness_blocks(sources, indptr, indices, n_blocks).sum(axis=0)
+
+
+@njit(cache=True, parallel=True, nogil=True)
+def _betweenness_blocks(sources, indptr, indices, n_blocks):
+    """
+    Parallel body of sampled_betweenness
+
+    Each block keeps its own BFS workspace and betweenness row, resetting only
+    the wallets reached from the previous source. Releases the GIL so other
+    threads can run alongside it.
+    """
+    n_nodes = indptr.size - 1
+    partial = np.zeros((n_blocks, n_nodes))
+    block_size = (sources.size + n_blocks - 1) // n_blocks
+
+    for block in prange(n_blocks):
+        sigma = np.zeros(n_nodes)
+        delta = np.zeros(n_nodes)
+        distance = np.full(n_nodes, -1, dtype=np.int64)
+        order = np.empty(n_nodes, dtype=np.int64)
+
+        for k in range(block * block_size, min((block + 1) * block_size, sources.size)):
+            source = sources[k]
+            sigma[source] = 1.0
+            distance[source] = 0
+            order[0] = source
+            head = 0
+            tail = 1
+
+            # BFS counting the shortest paths from the source to every wallet
+            while head < tail:
+                v = order[head]
+                head += 1
+                for edge in range(indptr[v], indptr[v + 1]):
+                    w = indices[edge]
+                    if distance[w] < 0:
+                        distance[w] = distance[v] + 1
+                        order[tail] = w
+                        tail += 1
+                    if distance[w] == distance[v] + 1:
+                        sigma[w] += sigma[v]
+
+            # Dependencies flow back from the farthest wallets
+            for i in range(tail - 1, -1, -1):
+                v = order[i]
+                for edge in range(indptr[v], indptr[v + 1]):
+                    w = indices[edge]
+                    if distance[w] == distance[v] + 1:
+                        delta[v] += sigma[v] / sigma[w] * (1.0 + delta[w])
+                if v != source:
+                    partial[block, v] += delta[v]
+
+            for i in range(tail):
+                v = order[i]
+                sigma[v] = 0.0
+                delta[v] = 0.0
+                distance[v] = -1
+    return partial
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def fruchterman_reingold(pos, indptr, indices, k, iterations, threshold):
+    """
+    Fruchterman-Reingold force-directed layout, updating pos (n, 2) in place
+
+    Same dynamics as networkx's dense spring layout: every pair of wallets
+    repels with k^2 / d, each edge pulls its source towards its target with
+    d^2 / k, and the step size cools linearly from a tenth of the initial
+    extent. Stops early once the mean step drops below threshold.
+    """
+    n = pos.shape[0]
+    displacement = np.zeros((n, 2))
+    t = max(pos[:, 0].max() - pos[:, 0].min(), pos[:, 1].max() - pos[:, 1].min()) * 0.1
+    dt = t / (iterations + 1)
+
+    for _ in range(iterations):
+        for i in prange(n):
+            xi = pos[i, 0]
+            yi = pos[i, 1]
+            fx = 0.0
+            fy = 0.0
+            # Repulsion from every other wallet
+            for j in range(n):
+                dx = xi - pos[j, 0]
+                dy = yi - pos[j, 1]
+                distance = max(np.sqrt(dx * dx + dy * dy), 0.01)
+                force = k * k / (distance * distance)
+                fx += dx * force
+                fy += dy * force
+            # Attraction along outgoing edges
+            for edge in range(indptr[i], indptr[i + 1]):
+                j = indices[edge]
+                dx = xi - pos[j, 0]
+                dy = yi - pos[j, 1]
+                distance = max(np.sqrt(dx * dx + dy * dy), 0.01)
+                fx -= dx * distance / k
+                fy -= dy * distance / k
+            displacement[i, 0] = fx
+            displacement[i, 1] = fy
+
+        moved = 0.0
+        for i in prange(n):
+            length = max(np.sqrt(displacement[i, 0] ** 2 + displacement[i, 1] ** 2), 0.01)
+            step_x = displacement[i, 0] * t / length
+            step_y = displacement[i, 1] * t / length
+            pos[i, 0] += step_x
+            pos[i, 1] += step_y
+            moved += step_x * step_x + step_y * step_y
+
+        t -= dt
+        if np.sqrt(moved) / n < threshold:
+            break
+    return pos
@@ -4,15 +4,209 @@ Creates interactive and static visualizations of the blockchain graph
 and detected money laundering patterns
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import networkx as nx
-import plotly.graph_objects as go
-from pyvis.network import Network
 import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from typing import Dict, List, Set
+import json
+import multiprocessing
 import os
 
+from ._kernels import NUMBA_AVAILABLE, fruchterman_reingold
+
+# Node styling by suspicion score band: scores are bucketed against the
+# thresholds, so the lookups below run from MINIMAL up to CRITICAL
+_SCORE_THRESHOLDS = np.array([20, 40, 60, 80], dtype=np.float32)
+_SCORE_COLORS = np.array(['#90EE90', '#FFD700', '#FFA500', '#FF8C00', '#FF4500'])
+_SCORE_SIZES = np.array([10, 12, 15, 20, 25])
+
+# vis.js slows to a crawl past a few thousand DOM nodes, so larger interactive
+# graphs are drawn with sigma.js, which renders through WebGL
+_PYVIS_MAX_NODES = 500
+_SIGMA_MAX_NODES = 20000
+_SIGMA_NODE_THRESHOLD = 3000
+
+# Above this many wallets the O(N^2) spring layout gives way to ForceAtlas2
+# with Barnes-Hut repulsion (O(N log N)) when the optional fa2 package is installed
+_BARNES_HUT_MIN_NODES = 2000
+
+# Largest full graph laid out here before it is written out; bigger graphs
+# start from random positions and are laid out in the browser instead
+_LAYOUT_MAX_NODES = 3000
+
+# ForceAtlas2 run by the sigma.js page when positions were not precomputed
+_SIGMA_BROWSER_LAYOUT = (
+    'const { default: forceAtlas2 } = '
+    'await import("https://esm.sh/graphology-layout-forceatlas2@0.10.1");\n'
+    '    forceAtlas2.assign(graph, { iterations: 100, settings: '
+    '{ ...forceAtlas2.inferSettings(graph), barnesHutOptimize: true } });')
+
+_SIGMA_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Smurfing Hunter - Transaction Graph</title>
+<style>
+  html, body {{ margin: 0; height: 100%; }}
+  #container {{ width: 100%; height: 100%; }}
+</style>
+</head>
+<body>
+<div id="container"></div>
+{data_script}
+<script type="module">
+  import Graph from "https://esm.sh/graphology@0.25.4";
+  import Sigma from "https://esm.sh/sigma@3.0.0";
+
+  async function draw(data) {{
+    const graph = new Graph({{ type: "directed", multi: false }});
+    graph.import(data);
+    {layout}
+    new Sigma(graph, document.getElementById("container"), {{ defaultEdgeType: "arrow" }});
+  }}
+
+  {load_data}
+</script>
+</body>
+</html>
+"""
+
+
+def _reservoir_sample(items, k: int) -> List:
+    """
+    Uniform random sample of k items from an iterable in a single pass,
+    holding only the sample in memory (Li's Algorithm L, which jumps over
+    runs of items instead of drawing a random number for each)
+    """
+    items = iter(items)
+    sample = list(islice(items, k))
+    if len(sample) < k or k == 0:
+        return sample
+    
+    w = np.exp(np.log(np.random.random()) / k)
+    while True:
+        skip = int(np.floor(np.log(np.random.random()) / np.log1p(-w)))
+        item = next(islice(items, skip, None), None)
+        if item is None:
+            return sample
+        sample[np.random.randint(k)] = item
+        w *= np.exp(np.log(np.random.random()) / k)
+
+
+def _barnes_hut_layout(subgraph: nx.DiGraph, nodes: List) -> Dict:
+    """
+    ForceAtlas2 layout with Barnes-Hut approximated repulsion, rescaled to
+    [-1, 1]; returns None when the fa2 package is not installed
+    """
+    try:
+        from fa2 import ForceAtlas2
+    except ImportError:
+        return None
+    
+    # ForceAtlas2 works on an undirected graph, i.e. a symmetric matrix
+    adjacency = nx.to_scipy_sparse_array(subgraph, nodelist=nodes, format='csr')
+    symmetric = ((adjacency + adjacency.T) > 0).astype(np.float64)
+    
+    forceatlas2 = ForceAtlas2(outboundAttractionDistribution=False, barnesHutOptimize=True,
+                              barnesHutTheta=1.2, scalingRatio=2.0, verbose=False)
+    positions = forceatlas2.forceatlas2(symmetric, pos=None, iterations=100)
+    return dict(zip(nodes, nx.rescale_layout(np.array(positions, dtype=np.float64))))
+
+
+def _bar_histogram(ax, values: np.ndarray, bins: int, **kwargs):
+    """
+    Draw a histogram binned in NumPy as one bar per bin, instead of handing the
+    raw values to ax.hist
+    """
+    counts, edges = np.histogram(values, bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **kwargs)
+
+
+# matplotlib and pyvis are imported on first use, so importing this module
+# (e.g. in worker processes, or just for the class) stays cheap
+_plt = None
+
+
+def _pyplot():
+    """
+    Import matplotlib.pyplot on first use, selecting the Agg backend since
+    figures are only ever written to files
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def _render_pattern(task):
+    """
+    Draw one pattern visualization and save it to a PNG
+    
+    task is a (pattern, nodes, edges, pos, output_file) tuple of plain data,
+    built by GraphVisualizer._pattern_task, so that it can be sent to worker
+    processes (which draw with the Agg backend selected on import).
+    """
+    import matplotlib.patches as mpatches
+    plt = _pyplot()
+    
+    pattern, nodes, edges, pos, output_file = task
+    subgraph = nx.DiGraph()
+    subgraph.add_nodes_from(nodes)
+    subgraph.add_edges_from(edges)
+    
+    plt.figure(figsize=(14, 10))
+    
+    # Color nodes by role
+    node_colors = []
+    node_sizes = []
+    
+    for node in subgraph.nodes():
+        if node in pattern['source_wallets']:
+            node_colors.append('#FF6B6B')  # Red
+            node_sizes.append(1000)
+        elif node in pattern['destination_wallets']:
+            node_colors.append('#4ECDC4')  # Cyan
+            node_sizes.append(1000)
+        elif node in pattern['intermediate_wallets']:
+            node_colors.append('#FFE66D')  # Yellow
+            node_sizes.append(700)
+        else:
+            node_colors.append('#C7CEEA')  # Light blue
+            node_sizes.append(400)
+    
+    # Draw graph
+    nx.draw_networkx_nodes(subgraph, pos, node_color=node_colors, 
+                           node_size=node_sizes, alpha=0.8).set_rasterized(True)
+    nx.draw_networkx_edges(subgraph, pos, edge_color='gray', 
+                           arrows=True, arrowsize=20, alpha=0.5,
+                           connectionstyle='arc3,rad=0.1')
+    
+    # Labels
+    labels = {node: node[:8] for node in subgraph.nodes()}
+    nx.draw_networkx_labels(subgraph, pos, labels, font_size=8)
+    
+    # Legend
+    legend_elements = [
+        mpatches.Patch(color='#FF6B6B', label='Source Wallet'),
+        mpatches.Patch(color='#FFE66D', label='Intermediate Wallet'),
+        mpatches.Patch(color='#4ECDC4', label='Destination Wallet'),
+        mpatches.Patch(color='#C7CEEA', label='Connected Wallet')
+    ]
+    plt.legend(handles=legend_elements, loc='upper left')
+    
+    plt.title(f"{pattern['pattern_type'].upper()} Pattern\n"
+             f"Suspicion Score: {pattern['suspicion_score']:.2f} | "
+             f"Total Amount: {pattern['total_amount']:.2f}")
+    plt.axis('off')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close()
+
 
 class GraphVisualizer:
     """
@@ -24,88 +218,191 @@ class GraphVisualizer:
         self.blockchain = blockchain_graph
         self.pattern_detector = pattern_detector
         self.suspicion_scorer = suspicion_scorer
+        self._illicit_set = frozenset(blockchain_graph.illicit_wallets)
         
     def visualize_full_graph(self, output_file: str = "full_graph.html",
-                            max_nodes: int = 500):
+                            max_nodes: int = None, external_data: bool = False,
+                            renderer: str = "auto"):
         """
         Create an interactive visualization of the entire graph
-        Uses PyVis for interactive HTML output
+        Uses PyVis for interactive HTML output, or sigma.js (WebGL) for large graphs
+        
+        renderer is 'pyvis', 'sigma' or 'auto', which picks sigma.js when more
+        than 3000 wallets would be drawn. max_nodes defaults to 500 wallets for
+        PyVis and 20000 for sigma.js. Graphs of up to 3000 wallets are laid out
+        here; larger ones are laid out by ForceAtlas2 in the browser (vis.js
+        physics or graphology's ForceAtlas2 for sigma.js).
+        
+        With external_data the node and edge data is written to a separate
+        JSON file next to the HTML and fetched when the page loads, keeping the
+        page itself small. Browsers block fetch() from file:// URLs, so such a
+        graph has to be served over HTTP (e.g. python -m http.server).
         """
         print(f"Creating interactive graph visualization...")
         
+        if renderer == "auto":
+            shown = min(self.graph.number_of_nodes(), max_nodes or _SIGMA_MAX_NODES)
+            renderer = "sigma" if shown > _SIGMA_NODE_THRESHOLD else "pyvis"
+        elif renderer not in ("pyvis", "sigma"):
+            raise ValueError(f"Unknown renderer: {renderer}")
+        if max_nodes is None:
+            max_nodes = _SIGMA_MAX_NODES if renderer == "sigma" else _PYVIS_MAX_NODES
+        
         # Limit nodes if graph is too large
         if self.graph.number_of_nodes() > max_nodes:
             # Get top suspicious nodes + illicit nodes
             top_nodes = set([w for w, _ in self.suspicion_scorer.get_top_suspicious_wallets(max_nodes // 2)])
-            illicit = set(self.blockchain.illicit_wallets)
+            illicit = self._illicit_set
             
-            # Add some random nodes for context
-            all_nodes = set(self.graph.nodes())
-            remaining = all_nodes - top_nodes - illicit
-            random_nodes = set(list(remaining)[:max_nodes // 4])
+            # Add some random nodes for context, sampled in one pass over the
+            # graph without copying its node set
+            skip = top_nodes | illicit
+            random_nodes = set(_reservoir_sample(
+                (n for n in self.graph.nodes() if n not in skip), max_nodes // 4))
             
             selected_nodes = top_nodes | illicit | random_nodes
-            subgraph = self.graph.subgraph(selected_nodes)
+            subgraph = self.graph.subgraph(selected_nodes).copy()
         else:
             subgraph = self.graph
         
-        # Create PyVis network
-        net = Network(height="800px", width="100%", directed=True, notebook=False)
-        net.barnes_hut(gravity=-10000, central_gravity=0.3, spring_length=100)
+        # Lay the graph out here rather than in the browser: positions are
+        # shipped as fixed x/y so vis.js skips its stabilization pass on load.
+        # The O(N^2) layout is too slow past a few thousand wallets, so larger
+        # graphs get random starting positions and are laid out in the browser
+        browser_layout = subgraph.number_of_nodes() > _LAYOUT_MAX_NODES
+        if browser_layout:
+            pos = dict(zip(subgraph.nodes(), np.random.rand(subgraph.number_of_nodes(), 2) * 2 - 1))
+        else:
+            pos = self._fast_spring_layout(subgraph, k=2, iterations=100)
         
         # Get wallet scores
         scores = self.suspicion_scorer.wallet_scores
         
         # Add nodes with styling based on suspicion score
-        for node in subgraph.nodes():
-            score = scores.get(node, 0)
-            is_illicit = node in self.blockchain.illicit_wallets
-            
-            # Color based on suspicion score
-            if is_illicit:
-                color = '#FF0000'  # Red for known illicit
-                size = 30
-            elif score >= 80:
-                color = '#FF4500'  # Orange-red for critical
-                size = 25
-            elif score >= 60:
-                color = '#FF8C00'  # Dark orange for high
-                size = 20
-            elif score >= 40:
-                color = '#FFA500'  # Orange for medium
-                size = 15
-            elif score >= 20:
-                color = '#FFD700'  # Gold for low
-                size = 12
-            else:
-                color = '#90EE90'  # Light green for minimal
-                size = 10
-            
-            # Create node label
-            label = f"{node[:8]}..."
-            title = (f"Wallet: {node}<br>"
-                    f"Suspicion Score: {score:.2f}<br>"
-                    f"Illicit: {is_illicit}<br>"
-                    f"In-degree: {self.graph.in_degree(node)}<br>"
-                    f"Out-degree: {self.graph.out_degree(node)}")
-            
-            net.add_node(node, label=label, title=title, color=color, size=size)
+        nodes_list = list(subgraph.nodes())
+        scores_arr = np.fromiter((scores.get(n, 0) for n in nodes_list),
+                                 dtype=np.float32, count=len(nodes_list))
+        illicit_mask = np.fromiter((n in self._illicit_set for n in nodes_list),
+                                   dtype=bool, count=len(nodes_list))
+        
+        bucket = np.searchsorted(_SCORE_THRESHOLDS, scores_arr, side='right')
+        colors = np.where(illicit_mask, '#FF0000', _SCORE_COLORS[bucket])  # Red for known illicit
+        sizes = np.where(illicit_mask, 30, _SCORE_SIZES[bucket])
+        
+        in_deg = dict(self.graph.in_degree(nodes_list))
+        out_deg = dict(self.graph.out_degree(nodes_list))
+        
+        labels = [f"{node[:8]}..." for node in nodes_list]
+        titles = [f"Wallet: {node}<br>"
+                  f"Suspicion Score: {score:.2f}<br>"
+                  f"Illicit: {is_illicit}<br>"
+                  f"In-degree: {in_deg[node]}<br>"
+                  f"Out-degree: {out_deg[node]}"
+                  for node, score, is_illicit in zip(nodes_list, scores_arr.tolist(),
+                                                     illicit_mask.tolist())]
+        
+        xy = np.array([pos[n] for n in nodes_list]).reshape(-1, 2) * 500
+        
+        # Edge widths from transaction amounts
+        edges = list(subgraph.edges(data=True))
+        amounts = np.fromiter((data.get('amount', 0) for _, _, data in edges),
+                              dtype=np.float64, count=len(edges))
+        widths = np.minimum(np.log10(amounts + 1.0) * 2.0, 10.0)
+        
+        if renderer == "sigma":
+            graph_data = {
+                'nodes': [{'key': node, 'attributes': {'label': label, 'color': color,
+                                                       'size': size / 2, 'x': x, 'y': y}}
+                          for node, label, color, size, x, y in zip(
+                              nodes_list, labels, colors.tolist(), sizes.tolist(),
+                              xy[:, 0].tolist(), xy[:, 1].tolist())],
+                'edges': [{'source': source, 'target': dest,
+                           'attributes': {'size': width / 2, 'color': '#CCCCCC',
+                                          'label': f"Amount: {amount:.2f}"}}
+                          for (source, dest, _), width, amount in zip(
+                              edges, widths.tolist(), amounts.tolist())]
+            }
+            self._save_graph_sigma(graph_data, output_file, external_data, browser_layout)
+            print(f"Interactive graph saved to {output_file}")
+            return
+        
+        # Create PyVis network
+        from pyvis.network import Network
+        net = Network(height="800px", width="100%", directed=True, notebook=False)
+        net.set_options('{"physics": {"enabled": %s, "solver": "forceAtlas2Based"}, '
+                        '"edges": {"smooth": {"type": "discrete"}}}'
+                        % json.dumps(browser_layout))
+        
+        net.add_nodes(nodes_list, label=labels, title=titles,
+                      color=colors.tolist(), size=sizes.tolist(),
+                      x=xy[:, 0].tolist(), y=xy[:, 1].tolist())
         
         # Add edges
-        for source, dest, data in subgraph.edges(data=True):
-            amount = data.get('amount', 0)
-            width = min(np.log10(amount + 1) * 2, 10)
-            
+        for (source, dest, _), width, amount in zip(edges, widths.tolist(), amounts.tolist()):
             title = f"Amount: {amount:.2f}"
             net.add_edge(source, dest, width=width, title=title, arrows='to')
         
         # Save
-        net.save_graph(output_file)
+        if external_data:
+            self._save_graph_external_data(net, output_file)
+        else:
+            net.save_graph(output_file)
         print(f"Interactive graph saved to {output_file}")
         
-    def visualize_pattern(self, pattern, output_file: str = "pattern.png"):
+    def _save_graph_external_data(self, net, output_file: str):
         """
-        Visualize a specific detected pattern
+        Save a PyVis network as an HTML shell plus a JSON file with its data
+        """
+        data_file = os.path.splitext(output_file)[0] + ".data.json"
+        with open(data_file, 'w') as f:
+            json.dump({'nodes': net.nodes, 'edges': net.edges}, f)
+        
+        # Render the page with empty datasets, then have it load the data
+        # before drawing
+        net.nodes, net.edges = [], []
+        net.save_graph(output_file)
+        
+        with open(output_file) as f:
+            html = f.read()
+        html = html.replace("nodes = new vis.DataSet([]);", "nodes = new vis.DataSet(graphData.nodes);")
+        html = html.replace("edges = new vis.DataSet([]);", "edges = new vis.DataSet(graphData.edges);")
+        html = html.replace(
+            "drawGraph();\n",
+            f"var graphData;\n"
+            f"              fetch({json.dumps(os.path.basename(data_file))})\n"
+            f"                  .then(response => response.json())\n"
+            f"                  .then(data => {{ graphData = data; drawGraph(); }});\n")
+        with open(output_file, 'w') as f:
+            f.write(html)
+    
+    def _save_graph_sigma(self, graph_data: Dict, output_file: str, external_data: bool,
+                          browser_layout: bool = False):
+        """
+        Save graphology-format graph data as a sigma.js HTML page
+        
+        With browser_layout the page runs ForceAtlas2 on the graph before drawing it.
+        """
+        if external_data:
+            data_file = os.path.splitext(output_file)[0] + ".data.json"
+            with open(data_file, 'w') as f:
+                json.dump(graph_data, f)
+            data_script = ""
+            load_data = (f"fetch({json.dumps(os.path.basename(data_file))})"
+                         f".then(response => response.json()).then(draw);")
+        else:
+            # Escape "</" so wallet labels cannot close the script tag early
+            data_json = json.dumps(graph_data).replace("</", "<\\/")
+            data_script = f'<script id="graph-data" type="application/json">{data_json}</script>'
+            load_data = 'draw(JSON.parse(document.getElementById("graph-data").textContent));'
+        
+        with open(output_file, 'w') as f:
+            f.write(_SIGMA_TEMPLATE.format(data_script=data_script, load_data=load_data,
+                                           layout=_SIGMA_BROWSER_LAYOUT if browser_layout else ""))
+    
+    def _pattern_subgraph_nodes(self, pattern) -> Set[str]:
+        """
+        Wallets shown in a pattern visualization: the pattern's wallets plus
+        up to three successors and predecessors of each
         """
         # Create subgraph with pattern nodes
         pattern_nodes = (pattern.source_wallets | pattern.intermediate_wallets | 
@@ -116,63 +413,63 @@ class GraphVisualizer:
         for node in pattern_nodes:
             subgraph_nodes.add(node)
             # Add neighbors to show connections
-            subgraph_nodes.update(list(self.graph.successors(node))[:3])
-            subgraph_nodes.update(list(self.graph.predecessors(node))[:3])
-        
-        subgraph = self.graph.subgraph(subgraph_nodes)
-        
-        # Create layout
-        plt.figure(figsize=(14, 10))
-        pos = nx.spring_layout(subgraph, k=2, iterations=50)
+            subgraph_nodes.update(islice(self.graph.successors(node), 3))
+            subgraph_nodes.update(islice(self.graph.predecessors(node), 3))
         
-        # Color nodes by role
-        node_colors = []
-        node_sizes = []
+        return subgraph_nodes
+    
+    def _pattern_task(self, pattern, subgraph, pos: Dict, output_file: str):
+        """
+        Package a pattern, its subgraph and their positions for _render_pattern
+        """
+        pattern_info = {
+            'pattern_type': pattern.pattern_type,
+            'suspicion_score': pattern.suspicion_score,
+            'total_amount': pattern.total_amount,
+            'source_wallets': pattern.source_wallets,
+            'intermediate_wallets': pattern.intermediate_wallets,
+            'destination_wallets': pattern.destination_wallets,
+        }
+        nodes = list(subgraph.nodes())
+        return (pattern_info, nodes, list(subgraph.edges()),
+                {node: pos[node] for node in nodes}, output_file)
+    
+    def visualize_pattern(self, pattern, output_file: str = "pattern.png", pos: Dict = None):
+        """
+        Visualize a specific detected pattern
         
-        for node in subgraph.nodes():
-            if node in pattern.source_wallets:
-                node_colors.append('#FF6B6B')  # Red
-                node_sizes.append(1000)
-            elif node in pattern.destination_wallets:
-                node_colors.append('#4ECDC4')  # Cyan
-                node_sizes.append(1000)
-            elif node in pattern.intermediate_wallets:
-                node_colors.append('#FFE66D')  # Yellow
-                node_sizes.append(700)
-            else:
-                node_colors.append('#C7CEEA')  # Light blue
-                node_sizes.append(400)
+        pos optionally gives precomputed positions covering the pattern's
+        subgraph (see visualize_all_patterns); otherwise a layout is computed.
+        """
+        subgraph = self.graph.subgraph(self._pattern_subgraph_nodes(pattern)).copy()
         
-        # Draw graph
-        nx.draw_networkx_nodes(subgraph, pos, node_color=node_colors, 
-                              node_size=node_sizes, alpha=0.8)
-        nx.draw_networkx_edges(subgraph, pos, edge_color='gray', 
-                              arrows=True, arrowsize=20, alpha=0.5,
-                              connectionstyle='arc3,rad=0.1')
+        # Create layout
+        if pos is None:
+            pos = self._fast_spring_layout(subgraph, k=2, iterations=10, warm_start=True)
         
-        # Labels
-        labels = {node: node[:8] for node in subgraph.nodes()}
-        nx.draw_networkx_labels(subgraph, pos, labels, font_size=8)
-        
-        # Legend
-        legend_elements = [
-            mpatches.Patch(color='#FF6B6B', label='Source Wallet'),
-            mpatches.Patch(color='#FFE66D', label='Intermediate Wallet'),
-            mpatches.Patch(color='#4ECDC4', label='Destination Wallet'),
-            mpatches.Patch(color='#C7CEEA', label='Connected Wallet')
-        ]
-        plt.legend(handles=legend_elements, loc='upper left')
-        
-        plt.title(f"{pattern.pattern_type.upper()} Pattern\n"
-                 f"Suspicion Score: {pattern.suspicion_score:.2f} | "
-                 f"Total Amount: {pattern.total_amount:.2f}")
-        plt.axis('off')
-        plt.tight_layout()
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        _render_pattern(self._pattern_task(pattern, subgraph, pos, output_file))
         
         print(f"Pattern visualization saved to {output_file}")
     
+    def _patterns_to_visualize(self, limit: int, min_wallets: int = 3) -> List:
+        """
+        Highest-scoring detected patterns worth drawing: patterns with fewer
+        than min_wallets wallets in the graph are skipped, and of patterns
+        covering the same wallets only the highest-scoring one is kept
+        """
+        candidates = [p for p in self.pattern_detector.detected_patterns
+                      if sum(1 for w in p.all_wallets if w in self.graph) >= min_wallets]
+        candidates.sort(key=lambda p: p.suspicion_score, reverse=True)
+        
+        patterns, seen = [], set()
+        for pattern in candidates:
+            if pattern.all_wallets not in seen:
+                seen.add(pattern.all_wallets)
+                patterns.append(pattern)
+                if len(patterns) == limit:
+                    break
+        return patterns
+    
     def visualize_all_patterns(self, output_dir: str = "patterns"):
         """
         Create visualizations for all detected patterns
@@ -181,9 +478,34 @@ class GraphVisualizer:
         
         print(f"Creating visualizations for {len(self.pattern_detector.detected_patterns)} patterns...")
         
-        for i, pattern in enumerate(self.pattern_detector.detected_patterns[:20]):  # Limit to top 20
+        patterns = self._patterns_to_visualize(limit=20)
+        
+        # Patterns share wallets, so one layout of all their subgraphs together
+        # is computed once and each pattern reuses its slice of it
+        union_nodes = set()
+        for pattern in patterns:
+            union_nodes |= self._pattern_subgraph_nodes(pattern)
+        self._pattern_layout = self._fast_spring_layout(self.graph.subgraph(union_nodes).copy(),
+                                                        k=2, iterations=10, warm_start=True)
+        
+        tasks = []
+        for i, pattern in enumerate(patterns):
             output_file = os.path.join(output_dir, f"pattern_{i+1}_{pattern.pattern_type}.png")
-            self.visualize_pattern(pattern, output_file)
+            subgraph = self.graph.subgraph(self._pattern_subgraph_nodes(pattern)).copy()
+            tasks.append(self._pattern_task(pattern, subgraph, self._pattern_layout, output_file))
+        
+        # Each figure is independent, so they are drawn in separate processes
+        # (pyplot itself is not thread-safe)
+        workers = min(os.cpu_count() or 1, len(tasks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                list(executor.map(_render_pattern, tasks))
+        else:
+            for task in tasks:
+                _render_pattern(task)
+        for task in tasks:
+            print(f"Pattern visualization saved to {task[-1]}")
         
         print(f"Pattern visualizations saved to {output_dir}/")
     
@@ -198,8 +520,9 @@ class GraphVisualizer:
         
         subgraph = self.blockchain.get_subgraph_around_wallet(illicit_wallet, hops)
         
+        plt = _pyplot()
         plt.figure(figsize=(16, 12))
-        pos = nx.spring_layout(subgraph, k=1.5, iterations=50)
+        pos = self._fast_spring_layout(subgraph, k=1.5, iterations=10, warm_start=True)
         
         # Get suspicion scores
         scores = self.suspicion_scorer.wallet_scores
@@ -229,10 +552,10 @@ class GraphVisualizer:
         
         # Draw
         nx.draw_networkx_nodes(subgraph, pos, node_color=node_colors,
-                              node_size=node_sizes, alpha=0.8)
+                               node_size=node_sizes, alpha=0.8).set_rasterized(True)
         nx.draw_networkx_edges(subgraph, pos, edge_color='gray',
-                              arrows=True, arrowsize=15, alpha=0.4,
-                              connectionstyle='arc3,rad=0.1')
+                               arrows=True, arrowsize=15, alpha=0.4,
+                               connectionstyle='arc3,rad=0.1')
         
         labels = {node: node[:8] for node in subgraph.nodes()}
         nx.draw_networkx_labels(subgraph, pos, labels, font_size=7)
@@ -242,21 +565,62 @@ class GraphVisualizer:
                  f"{subgraph.number_of_edges()} transactions)")
         plt.axis('off')
         plt.tight_layout()
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        plt.savefig(output_file, dpi=150, bbox_inches='tight')
         plt.close()
         
         print(f"Illicit subgraph visualization saved to {output_file}")
     
+    def _fast_spring_layout(self, subgraph: nx.DiGraph, k: float,
+                            iterations: int = 50, warm_start: bool = False) -> Dict:
+        """
+        Spring layout of a subgraph, computed by the compiled
+        Fruchterman-Reingold kernel when Numba is available
+        
+        Positions start at random, or with warm_start from the spectral layout
+        (which already separates clusters, so a few iterations suffice), and
+        are rescaled to [-1, 1] like nx.spring_layout; without Numba this falls
+        back to nx.spring_layout. Subgraphs of more than 2000 wallets use
+        ForceAtlas2 with Barnes-Hut repulsion instead when fa2 is installed.
+        """
+        nodes = list(subgraph.nodes())
+        if len(nodes) > _BARNES_HUT_MIN_NODES:
+            pos = _barnes_hut_layout(subgraph, nodes)
+            if pos is not None:
+                return pos
+        
+        initial = None
+        if warm_start and len(nodes) > 2:
+            try:
+                spectral = nx.spectral_layout(subgraph)
+                initial = np.array([spectral[node] for node in nodes], dtype=np.float64)
+            except Exception:
+                pass  # Eigensolver failed; start from random positions
+        
+        if not NUMBA_AVAILABLE:
+            pos0 = dict(zip(nodes, initial)) if initial is not None else None
+            return nx.spring_layout(subgraph, pos=pos0, k=k, iterations=iterations)
+        
+        if len(nodes) <= 1:
+            return {node: np.zeros(2) for node in nodes}
+        
+        if initial is None:
+            initial = np.random.rand(len(nodes), 2)
+        adjacency = nx.to_scipy_sparse_array(subgraph, nodelist=nodes, format='csr')
+        pos = fruchterman_reingold(initial, adjacency.indptr,
+                                   adjacency.indices, float(k), iterations, 1e-4)
+        return dict(zip(nodes, nx.rescale_layout(pos)))
+    
     def plot_suspicion_score_distribution(self, output_file: str = "score_distribution.png"):
         """
         Plot the distribution of suspicion scores
         """
-        scores = list(self.suspicion_scorer.wallet_scores.values())
+        scores = np.fromiter(self.suspicion_scorer.wallet_scores.values(), dtype=np.float32)
         
+        plt = _pyplot()
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
         
         # Histogram
-        ax1.hist(scores, bins=50, color='steelblue', alpha=0.7, edgecolor='black')
+        _bar_histogram(ax1, scores, bins=50, color='steelblue', alpha=0.7, edgecolor='black')
         ax1.set_xlabel('Suspicion Score')
         ax1.set_ylabel('Number of Wallets')
         ax1.set_title('Distribution of Suspicion Scores')
@@ -265,14 +629,21 @@ class GraphVisualizer:
         ax1.legend()
         ax1.grid(alpha=0.3)
         
-        # Box plot
-        ax2.boxplot(scores, vert=True)
+        # Box plot, drawn from statistics computed on the same array (whiskers
+        # reach the furthest scores within 1.5 IQR of the box, as in ax.boxplot)
+        q1, med, q3 = np.quantile(scores, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = scores[(scores >= q1 - 1.5 * iqr) & (scores <= q3 + 1.5 * iqr)]
+        ax2.bxp([{'med': med, 'q1': q1, 'q3': q3,
+                  'whislo': inside.min(), 'whishi': inside.max(),
+                  'fliers': scores[(scores < inside.min()) | (scores > inside.max())],
+                  'label': '1'}])
         ax2.set_ylabel('Suspicion Score')
         ax2.set_title('Suspicion Score Statistics')
         ax2.grid(alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        plt.savefig(output_file, dpi=150, bbox_inches='tight')
         plt.close()
         
         print(f"Score distribution plot saved to {output_file}")
@@ -281,14 +652,15 @@ class GraphVisualizer:
         """
         Create visualization of network statistics
         """
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(14, 10))
         
-        # Degree distribution
-        in_degrees = [d for n, d in self.graph.in_degree()]
-        out_degrees = [d for n, d in self.graph.out_degree()]
+        # Degree distribution (degrees and amounts come from the graph's CSR arrays)
+        in_degrees = self.blockchain.in_degree
+        out_degrees = self.blockchain.out_degree
         
-        axes[0, 0].hist(in_degrees, bins=30, alpha=0.6, label='In-degree', color='blue')
-        axes[0, 0].hist(out_degrees, bins=30, alpha=0.6, label='Out-degree', color='red')
+        _bar_histogram(axes[0, 0], in_degrees, bins=30, alpha=0.6, label='In-degree', color='blue')
+        _bar_histogram(axes[0, 0], out_degrees, bins=30, alpha=0.6, label='Out-degree', color='red')
         axes[0, 0].set_xlabel('Degree')
         axes[0, 0].set_ylabel('Frequency')
         axes[0, 0].set_title('Degree Distribution')
@@ -297,8 +669,8 @@ class GraphVisualizer:
         axes[0, 0].grid(alpha=0.3)
         
         # Transaction amounts
-        amounts = [data['amount'] for _, _, data in self.graph.edges(data=True)]
-        axes[0, 1].hist(amounts, bins=50, color='green', alpha=0.7)
+        amounts = self.blockchain.edge_amount
+        _bar_histogram(axes[0, 1], amounts, bins=50, color='green', alpha=0.7)
         axes[0, 1].set_xlabel('Transaction Amount')
         axes[0, 1].set_ylabel('Frequency')
         axes[0, 1].set_title('Transaction Amount Distribution')
@@ -306,9 +678,7 @@ class GraphVisualizer:
         axes[0, 1].grid(alpha=0.3)
         
         # Pattern statistics
-        pattern_types = {}
-        for pattern in self.pattern_detector.detected_patterns:
-            pattern_types[pattern.pattern_type] = pattern_types.get(pattern.pattern_type, 0) + 1
+        pattern_types = Counter(p.pattern_type for p in self.pattern_detector.detected_patterns)
         
         if pattern_types:
             axes[1, 0].bar(pattern_types.keys(), pattern_types.values(), color='orange', alpha=0.7)
@@ -319,13 +689,13 @@ class GraphVisualizer:
             axes[1, 0].grid(alpha=0.3)
         
         # Risk level distribution
-        risk_levels = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0, 'MINIMAL': 0}
-        for score in self.suspicion_scorer.wallet_scores.values():
-            risk_level = self.suspicion_scorer._get_risk_level(score)
-            risk_levels[risk_level] += 1
+        scores_arr = np.fromiter(self.suspicion_scorer.wallet_scores.values(), dtype=np.float32)
+        bucket = np.searchsorted(_SCORE_THRESHOLDS, scores_arr, side='right')
+        risk_counts = np.bincount(bucket, minlength=len(_SCORE_THRESHOLDS) + 1)[::-1]
         
         colors_risk = ['#FF0000', '#FF8C00', '#FFA500', '#FFD700', '#90EE90']
-        axes[1, 1].bar(risk_levels.keys(), risk_levels.values(), color=colors_risk, alpha=0.7)
+        axes[1, 1].bar(['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'MINIMAL'], risk_counts,
+                       color=colors_risk, alpha=0.7)
         axes[1, 1].set_xlabel('Risk Level')
         axes[1, 1].set_ylabel('Number of Wallets')
         axes[1, 1].set_title('Wallet Risk Level Distribution')
@@ -333,7 +703,7 @@ class GraphVisualizer:
         axes[1, 1].grid(alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        plt.savefig(output_file, dpi=150, bbox_inches='tight')
         plt.close()
         
         print(f"Network statistics plot saved to {output_file}")
@@ -363,7 +733,7 @@ class GraphVisualizer:
         illicit_dir = os.path.join(output_dir, "illicit_wallets")
         os.makedirs(illicit_dir, exist_ok=True)
         
-        for i, illicit_wallet in enumerate(list(self.blockchain.illicit_wallets)[:5]):
+        for i, illicit_wallet in enumerate(list(self._illicit_set)[:5]):
             if self.graph.has_node(illicit_wallet):
                 output_file = os.path.join(illicit_dir, f"illicit_{i+1}_{illicit_wallet[:8]}.png")
                 self.visualize_illicit_subgraph(illicit_wallet, hops=2, output_file=output_file)
@@ -0,0 +1,55 @@
+"""
+Tests for loading transaction and illicit wallet CSVs into a BlockchainGraph
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add src to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from smurfing_hunter.core.graph_builder import BlockchainGraph
+
+
+class TestLoadHexWalletIds(unittest.TestCase):
+    """
+    Short wallet IDs that parse as hex numbers must be kept verbatim
+    """
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.transactions_csv = os.path.join(self.tmpdir.name, 'transactions.csv')
+        self.illicit_csv = os.path.join(self.tmpdir.name, 'illicit_wallets.csv')
+        with open(self.transactions_csv, 'w') as f:
+            f.write("Source_Wallet_ID,Dest_Wallet_ID,Timestamp,Amount,Token_Type\n"
+                    "0xabc,0x012,2024-01-01 00:00:00,5.0,ETH\n"
+                    "0x012,0x1,2024-01-02 00:00:00,3.0,ETH\n")
+        with open(self.illicit_csv, 'w') as f:
+            f.write("Wallet_ID,Reason\n"
+                    "0xabc,Mixer\n")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_load_transactions_keeps_hex_ids(self):
+        blockchain = BlockchainGraph()
+        blockchain.load_transactions(self.transactions_csv)
+        
+        self.assertEqual(set(blockchain.graph.nodes), {'0xabc', '0x012', '0x1'})
+        self.assertTrue(blockchain.graph.has_edge('0xabc', '0x012'))
+        self.assertEqual(blockchain.transactions[0]['Source_Wallet_ID'], '0xabc')
+        self.assertEqual(blockchain.transactions[0]['Amount'], 5.0)
+    
+    def test_load_illicit_wallets_keeps_hex_ids(self):
+        blockchain = BlockchainGraph()
+        blockchain.load_transactions(self.transactions_csv)
+        blockchain.load_illicit_wallets(self.illicit_csv)
+        
+        self.assertEqual(blockchain.illicit_wallets, {'0xabc'})
+        self.assertTrue(blockchain.illicit_mask[blockchain.wallet_index['0xabc']])
+
+
+if __name__ == '__main__':
+    unittest.main()